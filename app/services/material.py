@@ -16,6 +16,7 @@ from app.utils import utils
 from app.utils import utils
 from app.utils import video_scorer
 from app.utils import rate_limiter
+from app.utils import safety_filters
 
 requested_count = 0
 
@@ -137,6 +138,7 @@ def search_videos_pexels(
             logger.error(f"search videos failed: {response}")
             return video_items
         videos = response["videos"]
+        negative_re = safety_filters.compile_terms(negative_terms) if negative_terms else None
         # loop through each video in the result
         for v in videos:
             # check for negative terms
@@ -147,19 +149,11 @@ def search_videos_pexels(
                 video_url_slug = v.get("url", "").lower()
                 # Check tags if available (Pexels API response usually contains tags in 'tags' list or just keywords in url)
                 # Pexels 'tags' field is list of strings
-                video_tags = [t.lower() for t in v.get("tags", [])]
+                # Tags are joined with newlines so a term can't match across two tags
+                video_tags = "\n".join(t.lower() for t in v.get("tags", []))
                 
-                for term in negative_terms:
-                    term = term.lower()
-                    if term in video_url_slug:
-                        should_skip = True
-                        break
-                    for tag in video_tags:
-                        if term in tag:
-                            should_skip = True
-                            break
-                    if should_skip:
-                        break
+                if negative_re.search(video_url_slug) or negative_re.search(video_tags):
+                    should_skip = True
                 
                 if should_skip:
                     logger.warning(f"Skipping video due to negative term: {v.get('url')}")
@@ -281,6 +275,7 @@ def search_videos_pixabay(
             logger.error(f"search videos failed: {response}")
             return video_items
         videos = response["hits"]
+        negative_re = safety_filters.compile_terms(negative_terms) if negative_terms else None
         # loop through each video in the result
         for v in videos:
             # check for negative terms
@@ -290,11 +285,8 @@ def search_videos_pixabay(
                 video_tags = v.get("tags", "").lower()
                 video_page_url = v.get("pageURL", "").lower()
 
-                for term in negative_terms:
-                    term = term.lower()
-                    if term in video_tags or term in video_page_url:
-                        should_skip = True
-                        break
+                if negative_re.search(video_tags) or negative_re.search(video_page_url):
+                    should_skip = True
                 
                 if should_skip:
                     logger.warning(f"Skipping video due to negative term: {v.get('pageURL')}")
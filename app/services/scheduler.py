@@ -94,12 +94,20 @@ def publish_due_tasks():
             logger.error(f"crash processing task {task_id}: {e}")
             db.update_publish_status(task_id, "failed", error_message=str(e))
 
+def run_db_maintenance():
+    """Checkpoint the WAL and vacuum the jobs database."""
+    db.cleanup_db()
+    logger.info("jobs database maintenance done")
+
 def run_scheduler():
     """Main scheduler loop."""
     logger.info("scheduler started")
     
     # Check every minute
     schedule.every(1).minutes.do(publish_due_tasks)
+
+    # Keep the jobs DB and its WAL compact
+    schedule.every(6).hours.do(run_db_maintenance)
     
     # Also run once immediately on startup?
     # publish_due_tasks() 
@@ -1,6 +1,7 @@
 import json
 import os.path
 import re
+from dataclasses import dataclass
 from html import unescape
 from timeit import default_timer as timer
 
@@ -181,6 +182,53 @@ def file_to_subtitles(filename):
     return times_texts
 
 
+@dataclass(slots=True)
+class Subtitle:
+    """One parsed SRT entry with its timestamps already converted to seconds."""
+    index: int
+    start: float
+    end: float
+    text: str
+    text_lower: str
+
+
+# (path, mtime) -> parsed subtitles, shared by the extractors that read the same file
+_parsed_cache = {}
+_PARSED_CACHE_MAX = 16
+
+
+def file_to_subtitles_fast(filename) -> list:
+    """
+    Like file_to_subtitles, but returns Subtitle records (start/end in seconds,
+    lower-cased text) and parses each file version only once per process.
+    """
+    if not filename or not os.path.isfile(filename):
+        return []
+
+    key = (filename, os.path.getmtime(filename))
+    cached = _parsed_cache.get(key)
+    if cached is not None:
+        return cached
+
+    subtitles = []
+    for index, time_str, text in file_to_subtitles(filename):
+        start_str, _, end_str = time_str.partition(" --> ")
+        subtitles.append(
+            Subtitle(
+                index=index,
+                start=utils.srt_time_to_seconds(start_str),
+                end=utils.srt_time_to_seconds(end_str),
+                text=text,
+                text_lower=text.lower(),
+            )
+        )
+
+    if len(_parsed_cache) >= _PARSED_CACHE_MAX:
+        _parsed_cache.clear()
+    _parsed_cache[key] = subtitles
+    return subtitles
+
+
 def levenshtein_distance(s1, s2):
     if len(s1) < len(s2):
         return levenshtein_distance(s2, s1)
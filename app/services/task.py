@@ -522,7 +522,7 @@ def start(task_id, params: VideoParams, stop_at: str = "video"):
 
     # 0b. Consolidate negative terms: safety + faceless
     if not params.video_negative_terms:
-        params.video_negative_terms = safety_filters.get_negative_terms(params.video_subject)
+        params.video_negative_terms = list(safety_filters.get_negative_terms(params.video_subject))
         logger.info(f"Auto-applied safety negative terms: {params.video_negative_terms}")
 
     if params.use_faceless:
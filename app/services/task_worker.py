@@ -2,7 +2,6 @@ import threading
 import time
 import json
 import traceback
-import hashlib
 from loguru import logger
 from app.utils import db
 from app.services import task as tm
@@ -67,6 +66,29 @@ class TaskWorker:
         self._threads = []
         logger.info("Task Worker Stopped")
 
+    def drain(self, worker_id: int = 1) -> int:
+        """
+        Process pending jobs in the calling thread until none are left (used by the
+        batch CLI's worker processes). Returns the number of jobs processed.
+        """
+        processed = 0
+        while not self._stop_event.is_set():
+            try:
+                job = self._claim_next_job()
+            except Exception as e:
+                logger.error(f"[Worker-{worker_id}] Claim Error: {e}")
+                break
+            if not job:
+                break
+            try:
+                self._process_job(job, worker_id)
+            except Exception as e:
+                # Failed before _process_job's own handler: don't leave the job stuck in 'processing'
+                logger.error(f"[Worker-{worker_id}] Job Error: {e}")
+                db.update_job_status(job['id'], 'failed', error_message=str(e))
+            processed += 1
+        return processed
+
     def _run_loop(self, worker_id: int):
         logger.info(f"[Worker-{worker_id}] Started")
         while not self._stop_event.is_set():
@@ -119,7 +141,7 @@ class TaskWorker:
 
             # [N3] Compute prompt_hash from subject + language for A/B tracking
             prompt_key = f"{params.video_subject}|{getattr(params, 'video_language', 'en')}"
-            prompt_hash = hashlib.sha256(prompt_key.encode()).hexdigest()[:12]
+            prompt_hash = db.compute_prompt_hash(prompt_key)
             
             # Execute task
             result = tm.start(task_id=job_id, params=params)
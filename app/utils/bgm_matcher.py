@@ -12,7 +12,7 @@ If you add custom BGM files, create subfolders in resource/songs/:
   etc.
 """
 
-import glob
+import functools
 import os
 import random
 from loguru import logger
@@ -48,6 +48,30 @@ CATEGORY_BGM_MAP = {
 }
 
 
+def _list_mp3s(directory: str) -> list:
+    """List .mp3 files in a directory via os.scandir; missing dirs yield []."""
+    try:
+        with os.scandir(directory) as it:
+            return [
+                e.path for e in it
+                if e.name.endswith(".mp3") and not e.name.startswith(".") and e.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+@functools.lru_cache(maxsize=None)
+def _resolved_for(song_dir: str, category: str) -> tuple:
+    """Resolve the mapped BGM files of a category that exist on disk (cached)."""
+    paths = (os.path.join(song_dir, f) for f in CATEGORY_BGM_MAP.get(category, ()))
+    return tuple(p for p in paths if os.path.exists(p))
+
+
+def reset_bgm_cache():
+    """Forget resolved BGM paths, e.g. after songs were added at runtime."""
+    _resolved_for.cache_clear()
+
+
 def get_bgm_for_category(category: str, bgm_type: str = "random", bgm_file: str = "") -> str:
     """
     Get a BGM file matched to the video category.
@@ -71,25 +95,23 @@ def get_bgm_for_category(category: str, bgm_type: str = "random", bgm_file: str
 
     # Check for category-specific subfolder first
     category_dir = os.path.join(song_dir, category.lower())
-    if os.path.isdir(category_dir):
-        files = glob.glob(os.path.join(category_dir, "*.mp3"))
-        if files:
-            selected = random.choice(files)
-            logger.info(f"BGM matched from category folder '{category}': {os.path.basename(selected)}")
-            return selected
+    files = _list_mp3s(category_dir)
+    if files:
+        selected = random.choice(files)
+        logger.info(f"BGM matched from category folder '{category}': {os.path.basename(selected)}")
+        return selected
 
     # Use category mapping
     if category in CATEGORY_BGM_MAP:
-        mapped_files = CATEGORY_BGM_MAP[category]
-        # Filter to only files that actually exist
-        existing = [os.path.join(song_dir, f) for f in mapped_files if os.path.exists(os.path.join(song_dir, f))]
+        # Only files that actually exist (resolved once per category)
+        existing = _resolved_for(song_dir, category)
         if existing:
             selected = random.choice(existing)
             logger.info(f"BGM matched for category '{category}': {os.path.basename(selected)}")
             return selected
     
     # Fallback: random from all available
-    files = glob.glob(os.path.join(song_dir, "*.mp3"))
+    files = _list_mp3s(song_dir)
     if files:
         selected = random.choice(files)
         logger.info(f"BGM fallback (random): {os.path.basename(selected)}")
@@ -2,21 +2,136 @@
 Database Module for MoneyPrinterTurbo.
 Handles SQLite connection and job tracking.
 """
+import atexit
 import sqlite3
 import json
 import os
 import hashlib
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from loguru import logger
 from app.utils import utils
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 DB_PATH = os.path.join(utils.root_dir(), "storage", "jobs.db")
 
+# Timestamps are stored as ISO-8601 text ("YYYY-MM-DD HH:MM:SS"), the same
+# shape as CURRENT_TIMESTAMP, so string comparisons order correctly.
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=" "))
+
+
+def _now(dt: datetime = None) -> str:
+    return (dt or datetime.now()).isoformat(sep=" ", timespec="seconds")
+
+
+def compute_prompt_hash(text: str) -> str:
+    """
+    [N3] 16-hex-char dedupe key for a prompt (stored in jobs.prompt_hash).
+    Uses the non-cryptographic xxh64 when available; sha256 otherwise.
+    """
+    data = text.encode("utf-8")
+    if xxhash is not None:
+        return xxhash.xxh64_hexdigest(data)
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+# Bump _SCHEMA_VERSION whenever a column is added to _JOB_COLUMN_MIGRATIONS
+# or the index set in init_db() changes
+_SCHEMA_VERSION = 2
+_JOB_COLUMN_MIGRATIONS = {
+    "duration_seconds": "REAL DEFAULT NULL",
+    "rating": "INTEGER DEFAULT NULL",
+    "prompt_hash": "TEXT DEFAULT NULL",
+}
+
+# OR IGNORE: inserting an existing job id is a no-op
+SQL_INSERT_JOB = """
+    INSERT OR IGNORE INTO jobs (id, topic, category, status, created_at, updated_at, meta_json, prompt_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_UPDATE_JOB_STATUS = """
+    UPDATE jobs SET status = ?, updated_at = ?,
+        error_message = COALESCE(?, error_message),
+        output_path = COALESCE(?, output_path),
+        attempts = COALESCE(?, attempts)
+    WHERE id = ?
+"""
+SQL_FAIL_STUCK_ALL = """
+    UPDATE jobs SET status = 'failed', error_message = ?,
+        duration_seconds = ROUND((julianday(?) - julianday(created_at)) * 86400, 1)
+    WHERE status = 'processing'
+"""
+SQL_FAIL_STUCK_BEFORE = SQL_FAIL_STUCK_ALL + " AND updated_at < ?"
+SQL_UPDATE_DURATION = "UPDATE jobs SET duration_seconds = ? WHERE id = ?"
+SQL_ALL_JOBS = "SELECT * FROM jobs ORDER BY updated_at DESC LIMIT ?"
+SQL_JOB_BY_TOPIC = "SELECT * FROM jobs WHERE topic = ? ORDER BY created_at DESC LIMIT 1"
+SQL_NEXT_PENDING = "SELECT * FROM jobs WHERE status = 'pending' ORDER BY created_at ASC LIMIT 1"
+SQL_CLAIM_RETURNING = """
+    UPDATE jobs SET status = 'processing', updated_at = ?
+    WHERE id = (SELECT id FROM jobs WHERE status = 'pending' ORDER BY created_at ASC LIMIT 1)
+    RETURNING *
+"""
+SQL_RETRY_ALL = "SELECT * FROM jobs WHERE status IN ('failed', 'processing') ORDER BY created_at"
+SQL_RETRY_CAT = "SELECT * FROM jobs WHERE status IN ('failed', 'processing') AND category = ? ORDER BY created_at"
+# Average computed by SQLite over the last N rows; non-positive durations are ignored (AVG skips NULL)
+SQL_AVG_DURATION_ALL = """
+    SELECT AVG(CASE WHEN d > 0 THEN d END) AS avg_duration FROM (
+        SELECT duration_seconds AS d FROM jobs
+        WHERE status = 'success' AND duration_seconds IS NOT NULL
+        ORDER BY updated_at DESC LIMIT ?
+    )
+"""
+SQL_AVG_DURATION_CAT = """
+    SELECT AVG(CASE WHEN d > 0 THEN d END) AS avg_duration FROM (
+        SELECT duration_seconds AS d FROM jobs
+        WHERE status = 'success' AND category = ? AND duration_seconds IS NOT NULL
+        ORDER BY updated_at DESC LIMIT ?
+    )
+"""
+
+# UPDATE ... RETURNING lets claim_next_pending_job read and write in one statement
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# One connection per thread, opened lazily and reused by every helper. Only the
+# thread-local holder references it, so it is closed when its thread exits.
+_tls = threading.local()
+_thread_conns = weakref.WeakSet()  # live _ThreadConnection holders, for close_connections()
+_connections_lock = threading.Lock()
+
+# Read-only connections for dashboard queries, opened on demand (see ro_conn)
+_READ_POOL_SIZE = 4
+_read_pool = queue.Queue()
+_read_conns = []  # every pooled connection opened so far (at most _READ_POOL_SIZE)
+_read_pool_opened = 0
+_read_pool_lock = threading.Lock()
+
+# Per-connection tuning applied to every new connection. journal_mode=WAL is
+# persistent in the DB file and is set once in init_db().
+_CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=134217728",
+)
+
 def init_db():
     """Initialize the database schema."""
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
+    # Lets cleanup_db() return freed pages to the OS. Only takes effect for a
+    # new database file (an existing one keeps its mode until a full VACUUM).
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    # WAL keeps readers non-blocking while a writer commits
+    cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS jobs (
             id TEXT PRIMARY KEY,
@@ -47,77 +162,154 @@ def init_db():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    # Migrate existing DB: add new columns if missing
-    for col, col_def in [
-        ("duration_seconds", "REAL DEFAULT NULL"),
-        ("rating", "INTEGER DEFAULT NULL"),
-        ("prompt_hash", "TEXT DEFAULT NULL"),
-    ]:
-        try:
-            cursor.execute(f"ALTER TABLE jobs ADD COLUMN {col} {col_def}")
-        except Exception:
-            pass  # Column already exists
+    # Migrate existing DB: add new columns if missing and (re)build the indexes.
+    # user_version records that this was done, so later calls (the Task History
+    # page runs init_db on every rerun) only read one pragma.
+    if cursor.execute("PRAGMA user_version").fetchone()["user_version"] < _SCHEMA_VERSION:
+        cols = {r["name"] for r in cursor.execute("PRAGMA table_info(jobs)")}
+        for col, col_def in _JOB_COLUMN_MIGRATIONS.items():
+            if col not in cols:
+                cursor.execute(f"ALTER TABLE jobs ADD COLUMN {col} {col_def}")
+        # Indexes for the hot status/topic/category/prompt lookups
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_topic_created ON jobs(topic, created_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_category_status ON jobs(category, status)")
+        # Partial covering index: prompt stats group rated rows without touching the table
+        cursor.execute("DROP INDEX IF EXISTS idx_jobs_prompt_hash")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_prompt_rated ON jobs(prompt_hash, rating, duration_seconds) "
+            "WHERE prompt_hash IS NOT NULL"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs(updated_at DESC)")
+        cursor.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        conn.commit()
+        # Statistics for the new indexes; cleanup_db() keeps them fresh afterwards
+        cursor.execute("ANALYZE")
     conn.commit()
-    conn.close()
-    logger.info(f"Database initialized at {DB_PATH}")
+    logger.info("Database initialized at {}", DB_PATH)
+
+def _dict_factory(cursor, row):
+    """Build result rows as plain dicts directly, instead of sqlite3.Row + dict()."""
+    return dict(zip([col[0] for col in cursor.description], row))
+
+def _open_connection(read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False, cached_statements=256
+        )
+    else:
+        # Room for every hot statement above in sqlite3's per-connection statement cache
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    conn.row_factory = _dict_factory
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class _ThreadConnection:
+    """
+    Owns one thread's connection. It is stored only in _tls, so when the thread
+    exits (e.g. a finished Streamlit ScriptRunner) the holder is collected and
+    the finalizer closes the connection; live ones are closed at exit.
+    """
+    __slots__ = ("conn", "close", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.close = weakref.finalize(self, conn.close)
+
 
 def get_connection():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    """Return this thread's cached connection, opening it on first use."""
+    holder = getattr(_tls, "holder", None)
+    if holder is None or not holder.close.alive:
+        holder = _ThreadConnection(_open_connection())
+        _tls.holder = holder
+        with _connections_lock:
+            _thread_conns.add(holder)
+    return holder.conn
+
+
+@contextmanager
+def ro_conn():
+    """
+    Borrow a read-only connection from a small pool. Under WAL these readers
+    never block (or wait on) the writer connections used by the job helpers.
+    """
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        global _read_pool_opened
+        with _read_pool_lock:
+            can_open = _read_pool_opened < _READ_POOL_SIZE
+            if can_open:
+                _read_pool_opened += 1
+        if can_open:
+            try:
+                conn = _open_connection(read_only=True)
+            except Exception:
+                with _read_pool_lock:
+                    _read_pool_opened -= 1
+                raise
+            with _read_pool_lock:
+                _read_conns.append(conn)
+        else:
+            conn = _read_pool.get()
+    try:
+        yield conn
+    finally:
+        _read_pool.put(conn)
+
+
+def close_connections():
+    """Close every cached connection (registered to run at interpreter exit)."""
+    global _read_pool_opened
+    with _connections_lock:
+        holders = list(_thread_conns)
+    for holder in holders:
+        try:
+            holder.close()
+        except Exception:
+            pass
+    with _read_pool_lock:
+        while not _read_pool.empty():
+            _read_pool.get_nowait()
+        while _read_conns:
+            try:
+                _read_conns.pop().close()
+            except Exception:
+                pass
+        _read_pool_opened = 0
+    _tls.holder = None
+
+
+atexit.register(close_connections)
 
 def insert_job(job_id, topic, category, status="pending", meta=None):
     try:
         conn = get_connection()
         c = conn.cursor()
         meta_str = json.dumps(meta) if meta else "{}"
-        # Check if job exists
-        c.execute("SELECT id FROM jobs WHERE id=?", (job_id,))
-        if c.fetchone():
-            return # Already exists
-            
-        c.execute("""
-            INSERT INTO jobs (id, topic, category, status, created_at, updated_at, meta_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (job_id, topic, category, status, datetime.now(), datetime.now(), meta_str))
+        now = _now()
+        c.execute(SQL_INSERT_JOB, (job_id, topic, category, status, now, now, meta_str, None))
         conn.commit()
-        conn.close()
     except Exception as e:
-        logger.error(f"DB Insert Error: {e}")
+        logger.error("DB Insert Error: {}", e)
 
 def update_job_status(job_id, status, error_message=None, output_path=None, attempts=None):
     try:
         conn = get_connection()
         c = conn.cursor()
-        updates = ["status = ?", "updated_at = ?"]
-        params = [status, datetime.now()]
-        
-        if error_message is not None:
-            updates.append("error_message = ?")
-            params.append(error_message)
-        if output_path is not None:
-            updates.append("output_path = ?")
-            params.append(output_path)
-        if attempts is not None:
-            updates.append("attempts = ?")
-            params.append(attempts)
-            
-        params.append(job_id)
-        
-        sql = f"UPDATE jobs SET {', '.join(updates)} WHERE id = ?"
-        c.execute(sql, params)
+        # None leaves the column unchanged, so one prepared statement serves every call
+        c.execute(SQL_UPDATE_JOB_STATUS, (status, _now(), error_message, output_path, attempts, job_id))
         conn.commit()
-        conn.close()
     except Exception as e:
-        logger.error(f"DB Update Error: {e}")
+        logger.error("DB Update Error: {}", e)
 
 def get_all_jobs(limit=100):
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT * FROM jobs ORDER BY updated_at DESC LIMIT ?", (limit,))
-        rows = c.fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+        with ro_conn() as conn:
+            return conn.execute(SQL_ALL_JOBS, (limit,)).fetchall()
     except Exception:
         return []
 
@@ -125,37 +317,54 @@ def get_job_by_topic(topic):
     """Retrieve the latest job for a given topic."""
     try:
         conn = get_connection()
-        conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT * FROM jobs WHERE topic = ? ORDER BY created_at DESC LIMIT 1", (topic,))
-        row = c.fetchone()
-        conn.close()
-        return dict(row) if row else None
+        c.execute(SQL_JOB_BY_TOPIC, (topic,))
+        return c.fetchone()
     except Exception as e:
-        logger.error(f"DB Fetch Error: {e}")
+        logger.error("DB Fetch Error: {}", e)
         return None
 
 
+# Stay well under SQLite's bound-parameter limit (999 before 3.32)
+_IN_CHUNK = 500
+
+
+def get_jobs_by_topics(topics) -> dict:
+    """
+    Latest job per topic for many topics at once: {topic: job}; topics without a
+    job are absent. One IN (...) query per 500 topics instead of a query per topic.
+    """
+    unique = list(dict.fromkeys(topics))
+    jobs = {}
+    try:
+        conn = get_connection()
+        for start in range(0, len(unique), _IN_CHUNK):
+            chunk = unique[start:start + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            # Ascending created_at: later rows overwrite, leaving the latest job per topic
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE topic IN ({placeholders}) ORDER BY created_at ASC", chunk
+            ).fetchall()
+            for row in rows:
+                jobs[row["topic"]] = row
+        return jobs
+    except Exception as e:
+        logger.error("DB Fetch Error: {}", e)
+        return jobs
+
+
 def get_retryable_jobs(category=None):
     """Get jobs with status 'failed' or 'processing' (stuck) that can be retried."""
     try:
         conn = get_connection()
-        conn.row_factory = sqlite3.Row
         c = conn.cursor()
         if category:
-            c.execute(
-                "SELECT * FROM jobs WHERE status IN ('failed', 'processing') AND category = ? ORDER BY created_at",
-                (category,)
-            )
+            c.execute(SQL_RETRY_CAT, (category,))
         else:
-            c.execute(
-                "SELECT * FROM jobs WHERE status IN ('failed', 'processing') ORDER BY created_at"
-            )
-        rows = c.fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+            c.execute(SQL_RETRY_ALL)
+        return c.fetchall()
     except Exception as e:
-        logger.error(f"DB Fetch Retryable Error: {e}")
+        logger.error("DB Fetch Retryable Error: {}", e)
         return []
 
 
@@ -167,12 +376,11 @@ def reset_job_for_retry(job_id):
         c.execute("""
             UPDATE jobs SET status = 'pending', error_message = NULL, 
             attempts = 0, updated_at = ? WHERE id = ?
-        """, (datetime.now(), job_id))
+        """, (_now(), job_id))
         conn.commit()
-        conn.close()
-        logger.info(f"Job {job_id} reset for retry")
+        logger.info("Job {} reset for retry", job_id)
     except Exception as e:
-        logger.error(f"DB Reset Error: {e}")
+        logger.error("DB Reset Error: {}", e)
 
 
 def delete_job(job_id):
@@ -182,23 +390,35 @@ def delete_job(job_id):
         c = conn.cursor()
         c.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
         conn.commit()
-        conn.close()
-        logger.info(f"Job {job_id} deleted")
+        logger.info("Job {} deleted", job_id)
+    except Exception as e:
+        logger.error("DB Delete Error: {}", e)
+
+def delete_jobs(job_ids) -> int:
+    """Delete many jobs in a single transaction. Returns the number of rows deleted."""
+    rows = [(job_id,) for job_id in job_ids]
+    if not rows:
+        return 0
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany("DELETE FROM jobs WHERE id = ?", rows)
+        conn.commit()
+        logger.info("{} jobs deleted", c.rowcount)
+        return c.rowcount
     except Exception as e:
-        logger.error(f"DB Delete Error: {e}")
+        logger.error("DB Bulk Delete Error: {}", e)
+        return 0
 
 def get_next_pending_job():
     """Get the oldest pending job (non-atomic, for single-worker use)."""
     try:
         conn = get_connection()
-        conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT * FROM jobs WHERE status = 'pending' ORDER BY created_at ASC LIMIT 1")
-        row = c.fetchone()
-        conn.close()
-        return dict(row) if row else None
+        c.execute(SQL_NEXT_PENDING)
+        return c.fetchone()
     except Exception as e:
-        logger.error(f"DB Fetch Next Job Error: {e}")
+        logger.error("DB Fetch Next Job Error: {}", e)
         return None
 
 
@@ -208,53 +428,68 @@ def claim_next_pending_job() -> dict | None:
     to 'processing'. This prevents multiple parallel workers from picking the same job.
     Returns the claimed job dict, or None if no pending jobs exist.
     """
+    if _HAS_RETURNING:
+        return _claim_next_pending_job_returning()
+    conn = None
     try:
         conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        conn.isolation_level = None  # autocommit off for manual transaction
         c = conn.cursor()
         c.execute("BEGIN EXCLUSIVE")
-        c.execute("SELECT * FROM jobs WHERE status = 'pending' ORDER BY created_at ASC LIMIT 1")
-        row = c.fetchone()
-        if row:
-            job = dict(row)
+        c.execute(SQL_NEXT_PENDING)
+        job = c.fetchone()
+        if job:
             c.execute(
                 "UPDATE jobs SET status = 'processing', updated_at = ? WHERE id = ?",
-                (datetime.now().isoformat(), job['id'])
+                (_now(), job['id'])
             )
-            c.execute("COMMIT")
-            conn.close()
+            conn.commit()
             return job
         else:
-            c.execute("ROLLBACK")
-            conn.close()
+            conn.rollback()
             return None
     except Exception as e:
-        logger.error(f"DB Claim Job Error: {e}")
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+        logger.error("DB Claim Job Error: {}", e)
+        return None
+
+
+def _claim_next_pending_job_returning() -> dict | None:
+    """Single-statement claim for SQLite >= 3.35 (no EXCLUSIVE lock needed)."""
+    conn = None
+    try:
+        conn = get_connection()
+        job = conn.execute(SQL_CLAIM_RETURNING, (_now(),)).fetchone()
+        conn.commit()
+        return job
+    except Exception as e:
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+        logger.error("DB Claim Job Error: {}", e)
         return None
 
 
 def fail_stuck_jobs(timeout_hours=0):
-    """Mark jobs stuck in 'processing' state as 'failed'."""
+    """
+    Mark jobs stuck in 'processing' state as 'failed', recording how long they
+    ran (duration_seconds) in the same UPDATE.
+    """
     try:
         conn = get_connection()
         c = conn.cursor()
+        now = _now()
         
         if timeout_hours > 0:
             # Calculate cutoff time
-            cutoff_time = datetime.now() - timedelta(hours=timeout_hours)
-            c.execute(
-                "UPDATE jobs SET status = 'failed', error_message = 'Timeout/Stuck' WHERE status = 'processing' AND updated_at < ?",
-                (cutoff_time,)
-            )
+            cutoff_time = _now(datetime.now() - timedelta(hours=timeout_hours))
+            c.execute(SQL_FAIL_STUCK_BEFORE, ('Timeout/Stuck', now, cutoff_time))
         else:
             # Fail all processing jobs
-            c.execute("UPDATE jobs SET status = 'failed', error_message = 'System crash or restart' WHERE status = 'processing'")
+            c.execute(SQL_FAIL_STUCK_ALL, ('System crash or restart', now))
             
         conn.commit()
-        conn.close()
     except Exception as e:
-        logger.error(f"DB Fail Stuck Jobs Error: {e}")
+        logger.error("DB Fail Stuck Jobs Error: {}", e)
 
 
 def update_job_duration(job_id: str, duration_seconds: float) -> None:
@@ -262,14 +497,10 @@ def update_job_duration(job_id: str, duration_seconds: float) -> None:
     try:
         conn = get_connection()
         c = conn.cursor()
-        c.execute(
-            "UPDATE jobs SET duration_seconds = ? WHERE id = ?",
-            (round(duration_seconds, 1), job_id)
-        )
+        c.execute(SQL_UPDATE_DURATION, (round(duration_seconds, 1), job_id))
         conn.commit()
-        conn.close()
     except Exception as e:
-        logger.error(f"DB Duration Update Error: {e}")
+        logger.error("DB Duration Update Error: {}", e)
 
 
 def get_avg_job_duration(category: str = None, last_n: int = 10) -> float | None:
@@ -278,26 +509,15 @@ def get_avg_job_duration(category: str = None, last_n: int = 10) -> float | None
     Used to compute ETA for pending/processing jobs.
     """
     try:
-        conn = get_connection()
-        c = conn.cursor()
-        if category:
-            c.execute(
-                "SELECT duration_seconds FROM jobs WHERE status='success' AND category=? AND duration_seconds IS NOT NULL ORDER BY updated_at DESC LIMIT ?",
-                (category, last_n)
-            )
-        else:
-            c.execute(
-                "SELECT duration_seconds FROM jobs WHERE status='success' AND duration_seconds IS NOT NULL ORDER BY updated_at DESC LIMIT ?",
-                (last_n,)
-            )
-        rows = c.fetchall()
-        conn.close()
-        if not rows:
-            return None
-        durations = [r[0] for r in rows if r[0] and r[0] > 0]
-        return round(sum(durations) / len(durations), 1) if durations else None
+        with ro_conn() as conn:
+            if category:
+                row = conn.execute(SQL_AVG_DURATION_CAT, (category, last_n)).fetchone()
+            else:
+                row = conn.execute(SQL_AVG_DURATION_ALL, (last_n,)).fetchone()
+        avg = row["avg_duration"]
+        return round(avg, 1) if avg is not None else None
     except Exception as e:
-        logger.error(f"DB Avg Duration Error: {e}")
+        logger.error("DB Avg Duration Error: {}", e)
         return None
 
 
@@ -310,37 +530,33 @@ def rate_job(job_id: str, rating: int) -> None:
         c = conn.cursor()
         c.execute("UPDATE jobs SET rating = ? WHERE id = ?", (rating, job_id))
         conn.commit()
-        conn.close()
-        logger.info(f"Job {job_id} rated: {'👍' if rating > 0 else '👎'}")
+        # Lazy: the emoji lambda only runs if an INFO sink accepts the record
+        logger.opt(lazy=True).info("Job {} rated: {}", lambda: job_id, lambda: '👍' if rating > 0 else '👎')
     except Exception as e:
-        logger.error(f"DB Rate Job Error: {e}")
+        logger.error("DB Rate Job Error: {}", e)
 
 
-def get_prompt_rating_stats() -> list[dict]:
+def get_prompt_rating_stats(limit: int = 50) -> list[dict]:
     """
-    [N3] Return aggregated rating stats grouped by prompt_hash.
+    [N3] Return aggregated rating stats grouped by prompt_hash (top `limit` by 👍).
     Used to identify which prompt variants perform best.
     """
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("""
-            SELECT prompt_hash,
-                   COUNT(*) as total,
-                   SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END) as thumbs_up,
-                   SUM(CASE WHEN rating = -1 THEN 1 ELSE 0 END) as thumbs_down,
-                   AVG(duration_seconds) as avg_duration
-            FROM jobs
-            WHERE prompt_hash IS NOT NULL
-            GROUP BY prompt_hash
-            ORDER BY thumbs_up DESC
-        """)
-        rows = c.fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+        with ro_conn() as conn:
+            return conn.execute("""
+                SELECT prompt_hash,
+                       COUNT(*) as total,
+                       SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END) as thumbs_up,
+                       SUM(CASE WHEN rating = -1 THEN 1 ELSE 0 END) as thumbs_down,
+                       AVG(duration_seconds) as avg_duration
+                FROM jobs
+                WHERE prompt_hash IS NOT NULL
+                GROUP BY prompt_hash
+                ORDER BY thumbs_up DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
     except Exception as e:
-        logger.error(f"DB Prompt Stats Error: {e}")
+        logger.error("DB Prompt Stats Error: {}", e)
         return []
 
 
@@ -350,18 +566,51 @@ def add_job(job_id, topic, category, status="pending", meta=None, prompt_hash=No
         conn = get_connection()
         c = conn.cursor()
         meta_str = json.dumps(meta) if meta else "{}"
-        c.execute("SELECT id FROM jobs WHERE id=?", (job_id,))
-        if c.fetchone():
-            conn.close()
-            return
-        c.execute("""
-            INSERT INTO jobs (id, topic, category, status, created_at, updated_at, meta_json, prompt_hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (job_id, topic, category, status, datetime.now(), datetime.now(), meta_str, prompt_hash))
+        now = _now()
+        c.execute(SQL_INSERT_JOB, (job_id, topic, category, status, now, now, meta_str, prompt_hash))
+        conn.commit()
+    except Exception as e:
+        logger.error("DB Add Job Error: {}", e)
+
+
+def insert_jobs_bulk(jobs) -> int:
+    """
+    Insert many jobs in a single transaction.
+    jobs: iterable of (job_id, topic, category, status, meta, prompt_hash) tuples.
+    Existing job ids are ignored. Returns the number of rows inserted.
+    """
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        now = _now()
+        rows = [
+            (job_id, topic, category, status, now, now, json.dumps(meta) if meta else "{}", prompt_hash)
+            for job_id, topic, category, status, meta, prompt_hash in jobs
+        ]
+        if not rows:
+            return 0
+        # executemany runs inside one implicit transaction: a single commit for all rows
+        c.executemany(SQL_INSERT_JOB, rows)
+        conn.commit()
+        return c.rowcount
+    except Exception as e:
+        logger.error("DB Bulk Insert Error: {}", e)
+        return 0
+
+def cleanup_db():
+    """
+    Periodic maintenance: truncate the WAL, release free pages and refresh
+    planner statistics so the DB file and working set stay small.
+    """
+    try:
+        conn = get_connection()
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+        conn.execute("ANALYZE")
         conn.commit()
-        conn.close()
     except Exception as e:
-        logger.error(f"DB Add Job Error: {e}")
+        logger.error("DB Cleanup Error: {}", e)
 
 # T5-5: Scheduled Publishing Methods
 
@@ -371,36 +620,33 @@ def add_to_publish_queue(video_path, platform, scheduled_time, metadata=None):
         conn = get_connection()
         c = conn.cursor()
         meta_str = json.dumps(metadata) if metadata else "{}"
+        now = _now()
         c.execute("""
             INSERT INTO publish_queue (video_path, platform, scheduled_time, status, metadata_json, created_at, updated_at)
             VALUES (?, ?, ?, 'pending', ?, ?, ?)
-        """, (video_path, platform, scheduled_time, meta_str, datetime.now(), datetime.now()))
+        """, (video_path, platform, scheduled_time, meta_str, now, now))
         conn.commit()
         last_id = c.lastrowid
-        conn.close()
-        logger.info(f"Added to publish queue: {video_path} for {platform} at {scheduled_time}")
+        logger.info("Added to publish queue: {} for {} at {}", video_path, platform, scheduled_time)
         return last_id
     except Exception as e:
-        logger.error(f"DB Add Publish Queue Error: {e}")
+        logger.error("DB Add Publish Queue Error: {}", e)
         return None
 
 def get_due_publish_tasks():
     """Get pending publish tasks that are due."""
     try:
         conn = get_connection()
-        conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        now = datetime.now()
+        now = _now()
         c.execute("""
             SELECT * FROM publish_queue 
             WHERE status = 'pending' AND scheduled_time <= ?
             ORDER BY scheduled_time ASC
         """, (now,))
-        rows = c.fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+        return c.fetchall()
     except Exception as e:
-        logger.error(f"DB Get Due Publish Error: {e}")
+        logger.error("DB Get Due Publish Error: {}", e)
         return []
 
 def update_publish_status(task_id, status, error_message=None):
@@ -409,7 +655,7 @@ def update_publish_status(task_id, status, error_message=None):
         conn = get_connection()
         c = conn.cursor()
         updates = ["status = ?", "updated_at = ?"]
-        params = [status, datetime.now()]
+        params = [status, _now()]
         
         if error_message:
             updates.append("error_message = ?")
@@ -420,6 +666,5 @@ def update_publish_status(task_id, status, error_message=None):
         sql = f"UPDATE publish_queue SET {', '.join(updates)} WHERE id = ?"
         c.execute(sql, params)
         conn.commit()
-        conn.close()
     except Exception as e:
-        logger.error(f"DB Update Publish Status Error: {e}")
+        logger.error("DB Update Publish Status Error: {}", e)
@@ -1,8 +1,12 @@
 
+import math
 import re
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import imageio_ffmpeg
+import numpy as np
 from loguru import logger
-from moviepy import VideoFileClip
 from app.utils import utils
 
 # Keywords that might indicate an engaging moment
@@ -15,12 +19,16 @@ EMOTIONAL_KEYWORDS = [
     "terungkap", "akhirnya", "waduh", "mantap"
 ]
 
-def score_segment(text: str) -> int:
+# One alternation instead of a substring scan per keyword
+_KEYWORD_RE = re.compile("|".join(re.escape(k) for k in EMOTIONAL_KEYWORDS))
+_DIGIT_RE = re.compile(r"\d")
+
+def score_segment(text: str, text_lower: str = None) -> int:
     """
     Score a text segment for potential virality.
+    Pass text_lower when the caller already has it to skip re-lowering.
     """
     score = 0
-    text_lower = text.lower()
     
     # Question marks (Hooks/Engagement)
     score += text.count("?") * 2
@@ -28,19 +36,32 @@ def score_segment(text: str) -> int:
     # Exclamations
     score += text.count("!") * 2
     
-    # Emotional keywords
-    for keyword in EMOTIONAL_KEYWORDS:
-        if keyword in text_lower:
-            score += 3
+    # Emotional keywords (each keyword counts once)
+    if text_lower is None:
+        text_lower = text.lower()
+    score += len(set(_KEYWORD_RE.findall(text_lower))) * 3
             
     # Numbers (often stats or facts)
-    # Simple regex for numbers > 100 or specific patterns?
-    # Actually any number might be interesting.
-    if re.search(r'\d+', text):
+    if _DIGIT_RE.search(text):
         score += 1
         
     return score
 
+def _cut_clip(video_path: str, start: float, end: float, out_path: str):
+    """
+    Cut [start, end] into out_path by stream copy (no decode/re-encode).
+    -ss before -i seeks on the input, so the cut snaps to the previous keyframe.
+    """
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+        "-ss", f"{start:.3f}", "-to", f"{end:.3f}",
+        "-i", video_path,
+        "-c", "copy", "-movflags", "+faststart",
+        out_path,
+    ]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
 def extract_highlights(video_path: str, subtitle_path: str, output_dir: str, max_clips: int = 3, clip_duration: float = 20.0):
     """
     Extract highlight clips from video based on subtitle analysis.
@@ -54,27 +75,18 @@ def extract_highlights(video_path: str, subtitle_path: str, output_dir: str, max
             logger.warning(f"subtitle file not found: {subtitle_path}, skipping highlights")
             return []
             
-        subs = subtitle.file_to_subtitles(subtitle_path)
+        subs = subtitle.file_to_subtitles_fast(subtitle_path)
         if not subs:
             return []
             
         # 1. Score segments
-        # We need to look at windows of text, not just single lines.
-        # A highlight is 20s. We should slide a window?
-        # Or score each subtitle line, then find dense areas.
-        
-        # Let's verify timeline.
-        # Map time to score.
+        # Score each subtitle line, then find dense areas.
         timeline_scores = []
         
         for sub in subs:
-            # sub: (index, time_str, text)
-            start_str = sub[1].split(" --> ")[0]
-            start_time = utils.srt_time_to_seconds(start_str)
-            text = sub[2]
-            score = score_segment(text)
+            score = score_segment(sub.text, sub.text_lower)
             if score > 0:
-                timeline_scores.append({"time": start_time, "score": score, "text": text})
+                timeline_scores.append({"time": sub.start, "score": score, "text": sub.text})
                 
         logger.info(f"found {len(timeline_scores)} scored segments: {timeline_scores}")
                 
@@ -83,60 +95,61 @@ def extract_highlights(video_path: str, subtitle_path: str, output_dir: str, max
             return []
             
         # 2. Find peaks
-        # We want non-overlapping windows of `clip_duration`.
-        # Simple algorithm: Sort by score. Pick highest. Mark window as used. Repeat.
-        
-        timeline_scores.sort(key=lambda x: x["score"], reverse=True)
-        
-        selected_clips = []
-        full_duration = 0
+        # Bin scores per second and score every clip_duration-wide window with a
+        # prefix sum, so dense clusters of moments beat a single isolated line.
+        # Then repeatedly take the best window and suppress its overlapping starts.
         try:
-             clip_for_dur = VideoFileClip(video_path)
-             full_duration = clip_for_dur.duration
-             clip_for_dur.close()
-        except:
-             full_duration = 300 # Fallback 5 mins if read fails (unlikely if path valid)
+             full_duration = utils.get_video_duration(video_path)
+        except Exception as e:
+             logger.warning(f"cannot read video duration of {video_path}: {e}, skipping highlights")
+             return []
 
-        used_ranges = []
-        
+        n_secs = max(1, int(math.ceil(full_duration)))
+        window = max(1, int(round(clip_duration)))
+        buckets = np.zeros(n_secs, dtype=np.int64)
         for item in timeline_scores:
-            if len(selected_clips) >= max_clips:
+            buckets[min(int(item["time"]), n_secs - 1)] += item["score"]
+
+        prefix = np.concatenate(([0], np.cumsum(buckets)))
+        last_start = max(0, n_secs - window)
+        window_ends = np.minimum(np.arange(last_start + 1) + window, n_secs)
+        window_scores = prefix[window_ends] - prefix[:last_start + 1]
+
+        selected_clips = []
+        while len(selected_clips) < max_clips:
+            best = int(np.argmax(window_scores))
+            score = int(window_scores[best])
+            if score <= 0:
                 break
-                
-            center_time = item["time"]
-            # Center the clip around the moment
-            half_dur = clip_duration / 2
-            start = max(0, center_time - half_dur)
+            # Equal-scoring starts form a run; take its middle so the moments sit
+            # centered in the clip rather than at its edge
+            run_end = best
+            while run_end < last_start and window_scores[run_end + 1] == score:
+                run_end += 1
+            best = (best + run_end) // 2
+            start = float(best)
             end = min(full_duration, start + clip_duration)
-            
-            # Re-adjust start if end was clamped
-            if end == full_duration:
-                start = max(0, end - clip_duration)
-                
-            # Check overlap
-            is_overlapping = False
-            for r in used_ranges:
-                # Check intersection
-                if max(start, r[0]) < min(end, r[1]): # Overlap condition
-                    is_overlapping = True
-                    break
-            
-            if not is_overlapping:
-                selected_clips.append((start, end, item["score"]))
-                used_ranges.append((start, end))
+            selected_clips.append((start, end, score))
+            window_scores[max(0, best - window + 1):best + window] = -1
 
         logger.info(f"selected {len(selected_clips)} clips: {selected_clips}")
                 
         # 3. Extract Clips
+        # No filtering is applied, so each clip is a stream-copy remux via ffmpeg.
+        # The cuts are independent and ffmpeg runs out of process, so run them together.
         saved_paths = []
-        # Re-open clip to avoid long open handle
-        with VideoFileClip(video_path) as clip:
+        if not selected_clips:
+            return saved_paths
+
+        with ThreadPoolExecutor(max_workers=len(selected_clips)) as executor:
+            futures = []
             for i, (start, end, score) in enumerate(selected_clips):
                 out_name = f"highlight_{i+1}_score{score}.mp4"
                 out_path = os.path.join(output_dir, out_name)
-                
-                subclip = clip.subclipped(start, end)
-                subclip.write_videofile(out_path, codec="libx264", audio_codec="aac", logger=None)
+                futures.append((i, out_path, score, executor.submit(_cut_clip, video_path, start, end, out_path)))
+
+            for i, out_path, score, future in futures:
+                future.result()
                 saved_paths.append(out_path)
                 logger.info(f"exported highlight {i+1}: {out_path} (score: {score})")
                 
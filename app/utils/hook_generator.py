@@ -110,6 +110,8 @@ def get_hook_text(category: str = "General", subject: str = "", auto_optimize: b
     Returns:
         Hook text string
     """
+    templates = HOOK_TEMPLATES.get(category, GENERIC_HOOKS)
+
     # T6-6: Auto-feedback loop
     if auto_optimize:
         try:
@@ -119,15 +121,18 @@ def get_hook_text(category: str = "General", subject: str = "", auto_optimize: b
             proven_hooks = [h for h in top_hooks if h.get("avg_retention", 0) > 0.5]
             
             if proven_hooks:
-                # 70% chance to pick a proven hook, 30% chance to explore new ones (Epsilon-Greedy like)
-                if random.random() < 0.7:
-                    selected = random.choice(proven_hooks)["hook_template"]
-                    logger.info(f"Auto-Feedback: Selected proven hook for '{category}': {selected}")
-                    return selected
+                # Epsilon-greedy in one draw: proven hooks share 70% of the mass in
+                # proportion to their retention, the templates share the other 30%
+                total_retention = sum(h["avg_retention"] for h in proven_hooks)
+                population = [h["hook_template"] for h in proven_hooks] + list(templates)
+                weights = [0.7 * h["avg_retention"] / total_retention for h in proven_hooks]
+                weights += [0.3 / len(templates)] * len(templates)
+                hook = random.choices(population, weights=weights, k=1)[0]
+                logger.info(f"Auto-Feedback: Selected hook for '{category}': {hook}")
+                return hook
         except Exception as e:
             logger.warning(f"Auto-Feedback failed: {e}")
 
-    templates = HOOK_TEMPLATES.get(category, GENERIC_HOOKS)
     hook = random.choice(templates)
     logger.info(f"Hook selected for '{category}': {hook}")
     return hook
@@ -6,6 +6,9 @@ import argparse
 # Config
 SESSION_FILE = "instagram_session.json"
 
+# Logged-in clients by username, so batch uploads authenticate once per process
+_clients = {}
+
 def login(username, password):
     """
     Login to Instagram and save session.
@@ -27,11 +30,21 @@ def login(username, password):
     logger.success(f"Login successful! Session saved to {SESSION_FILE}")
     return cl
 
+def _get_client(username, password):
+    """
+    Return the cached client for username, logging in (and saving the session) only once.
+    """
+    cl = _clients.get(username)
+    if cl is None:
+        cl = login(username, password)
+        _clients[username] = cl
+    return cl
+
 def upload_reel(username, password, video_path, caption):
     """
     Upload a video as Reel.
     """
-    cl = login(username, password)
+    cl = _get_client(username, password)
     
     logger.info(f"Uploading Reel: {video_path}")
     try:
@@ -43,6 +56,8 @@ def upload_reel(username, password, video_path, caption):
         return True
     except Exception as e:
         logger.error(f"Upload failed: {e}")
+        # The session may have expired; log in again on the next upload
+        _clients.pop(username, None)
         return False
 
 if __name__ == "__main__":
@@ -2,57 +2,175 @@
 LLM Response Cache — app/utils/llm_cache.py
 
 Caches LLM responses to SQLite to avoid redundant API calls.
-Cache key: SHA256(prompt_type + subject + language + extra_params)
+Cache key: xxh3_128 (SHA256 fallback) of prompt_type + subject + language + extra_params
 TTL: 7 days (configurable)
 """
+import atexit
+import collections
 import hashlib
-import json
 import os
+import queue
 import sqlite3
+import threading
 import time
 from typing import Optional
 
 from loguru import logger
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 _CACHE_TTL_SECONDS = 7 * 24 * 3600  # 7 days
 _DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "storage", "llm_cache.db")
 
 
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+# In-process LRU in front of SQLite: cache_key -> (response, created_at)
+_MEM_MAX = 1024
+_MEM: "collections.OrderedDict[str, tuple]" = collections.OrderedDict()
+_mem_lock = threading.Lock()
+
+# set() only queues the row; a daemon thread writes queued rows in batched
+# transactions, collecting for up to _FLUSH_INTERVAL seconds per batch
+_FLUSH_INTERVAL = 0.1
+_write_q: "queue.Queue[tuple]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
 def _get_conn() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(_DB_PATH)
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS llm_cache (
-            cache_key TEXT PRIMARY KEY,
-            response  TEXT NOT NULL,
-            created_at INTEGER NOT NULL
-        )
-        """
-    )
-    conn.commit()
-    return conn
+    """Return the shared connection, opening it and creating the table on first use."""
+    global _conn
+    if _conn is None:
+        with _lock:
+            if _conn is None:
+                os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
+                conn = sqlite3.connect(_DB_PATH, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA temp_store=MEMORY")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        response  TEXT NOT NULL,
+                        created_at INTEGER NOT NULL
+                    )
+                    """
+                )
+                _conn = conn
+    return _conn
+
+
+def _close_conn() -> None:
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
+def _write_batch(rows: list) -> None:
+    conn = _get_conn()
+    with _lock:
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO llm_cache (cache_key, response, created_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _writer_loop() -> None:
+    while True:
+        rows = [_write_q.get()]
+        deadline = time.monotonic() + _FLUSH_INTERVAL
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(_write_q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _write_batch(rows)
+        except Exception as e:
+            logger.warning(f"[LLM Cache] write error: {e}")
+        finally:
+            for _ in rows:
+                _write_q.task_done()
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_writer_loop, name="llm-cache-writer", daemon=True)
+                _writer.start()
+
+
+def flush() -> None:
+    """Block until every queued write has been committed."""
+    if _writer is not None:
+        _write_q.join()
+
+
+# atexit runs in reverse order: flush pending writes, then close
+atexit.register(_close_conn)
+atexit.register(flush)
 
 
 def _make_key(prompt_type: str, **kwargs) -> str:
-    payload = json.dumps({"type": prompt_type, **kwargs}, sort_keys=True)
-    return hashlib.sha256(payload.encode()).hexdigest()
+    # Callers pass plain str/int/bool kwargs, whose repr is stable and much
+    # cheaper to build than a JSON document
+    payload = repr((prompt_type,) + tuple(sorted(kwargs.items()))).encode("utf-8")
+    # The key only has to be collision-free, not cryptographic
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(payload)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _mem_put(key: str, response: str, created_at: int) -> None:
+    with _mem_lock:
+        _MEM[key] = (response, created_at)
+        _MEM.move_to_end(key)
+        if len(_MEM) > _MEM_MAX:
+            _MEM.popitem(last=False)
 
 
 def get(prompt_type: str, **kwargs) -> Optional[str]:
     """Return cached response or None if missing/expired."""
     key = _make_key(prompt_type, **kwargs)
+    with _mem_lock:
+        row = _MEM.get(key)
+        if row:
+            _MEM.move_to_end(key)
+    if row and time.time() - row[1] < _CACHE_TTL_SECONDS:
+        logger.info(f"[LLM Cache] HIT for {prompt_type} (memory, age: {int(time.time() - row[1])}s)")
+        return row[0]
+
     try:
         conn = _get_conn()
-        row = conn.execute(
-            "SELECT response, created_at FROM llm_cache WHERE cache_key = ?", (key,)
-        ).fetchone()
-        conn.close()
+        with _lock:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
         if row:
             response, created_at = row
             age = time.time() - created_at
             if age < _CACHE_TTL_SECONDS:
                 logger.info(f"[LLM Cache] HIT for {prompt_type} (age: {int(age)}s)")
+                _mem_put(key, response, created_at)
                 return response
             else:
                 logger.info(f"[LLM Cache] EXPIRED for {prompt_type} (age: {int(age)}s)")
@@ -64,28 +182,21 @@ def get(prompt_type: str, **kwargs) -> Optional[str]:
 def set(prompt_type: str, response: str, **kwargs) -> None:
     """Store a response in the cache."""
     key = _make_key(prompt_type, **kwargs)
-    try:
-        conn = _get_conn()
-        conn.execute(
-            "INSERT OR REPLACE INTO llm_cache (cache_key, response, created_at) VALUES (?, ?, ?)",
-            (key, response, int(time.time())),
-        )
-        conn.commit()
-        conn.close()
-        logger.info(f"[LLM Cache] STORED for {prompt_type}")
-    except Exception as e:
-        logger.warning(f"[LLM Cache] write error: {e}")
+    created_at = int(time.time())
+    _mem_put(key, response, created_at)
+    _ensure_writer()
+    _write_q.put((key, response, created_at))
+    logger.info(f"[LLM Cache] STORED for {prompt_type}")
 
 
 def clear_expired() -> int:
     """Remove expired entries. Returns number of rows deleted."""
     cutoff = int(time.time()) - _CACHE_TTL_SECONDS
     try:
+        flush()
         conn = _get_conn()
-        cursor = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with _lock:
+            deleted = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,)).rowcount
         logger.info(f"[LLM Cache] Cleared {deleted} expired entries")
         return deleted
     except Exception as e:
@@ -3,6 +3,11 @@ import os
 from loguru import logger
 from app.services import llm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def generate_youtube_metadata(video_subject: str, video_script: str, output_dir: str) -> dict:
     """
@@ -55,7 +60,8 @@ Rules:
             cleaned = cleaned[:-3]
         cleaned = cleaned.strip()
 
-        metadata = json.loads(cleaned)
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the handler below covers both
+        metadata = orjson.loads(cleaned) if orjson is not None else json.loads(cleaned)
         
         # Save metadata file
         metadata_path = os.path.join(output_dir, "metadata.txt")
@@ -67,8 +73,12 @@ Rules:
 
         # Also save raw JSON
         json_path = os.path.join(output_dir, "metadata.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(json_path, "wb") as f:
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
 
         logger.success(f"YouTube metadata saved to: {metadata_path}")
         return metadata
@@ -2,14 +2,18 @@
 import re
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from moviepy import ImageSequenceClip
-from app.utils import utils
+from moviepy import VideoClip
 from loguru import logger
 
+# Matches 10, 100, 1,000. Ignore single digits.
+_NUM_RE = re.compile(r'\b(\d{2,}(?:[.,]\d+)?)\b')
+# Strips thousands/decimal separators in one pass
+_SEPARATORS = str.maketrans("", "", ",.")
+
 def extract_numbers_from_script(script: str, subtitles: list) -> list:
     """
     Find numbers >= 100 in script and map them to timestamps using subtitle data.
-    subtitles: list of (index, time_str, text) from file_to_subtitles
+    subtitles: list of Subtitle records from subtitle.file_to_subtitles_fast
     Returns: [{"value": 1000, "start": 1.5, "end": 2.5}, ...]
     """
     numbers = []
@@ -22,22 +26,15 @@ def extract_numbers_from_script(script: str, subtitles: list) -> list:
     # We iterate subtitles to find numbers in them
     # This is safer than aligning script to subtitles manually
     
-    pattern = r'\b(\d{2,}(?:[.,]\d+)?)\b' # Matches 10, 100, 1,000. Ignore single digits.
-    
-    for item in subtitles:
-        # item: (index, "00:00:01,000 --> ...", "text")
-        time_str = item[1]
-        text = item[2]
+    for sub in subtitles:
+        text = sub.text
+        start = sub.start
+        end = sub.end
         
-        start_str, end_str = time_str.split(" --> ")
-        start = utils.srt_time_to_seconds(start_str)
-        end = utils.srt_time_to_seconds(end_str)
-        
-        matches = re.finditer(pattern, text)
-        for match in matches:
+        for match in _NUM_RE.finditer(text):
             num_str = match.group(1)
             # Clean num_str (remove commas)
-            clean_str = num_str.replace(",", "").replace(".", "")
+            clean_str = num_str.translate(_SEPARATORS)
             try:
                 # If dot was decimal, this might be wrong.
                 # Heuristic: if '.' in text, treat as decimal?
@@ -60,12 +57,11 @@ def extract_numbers_from_script(script: str, subtitles: list) -> list:
                 
     return numbers
 
-def create_counter_clip(target_number: int, duration: float = 1.5, size: tuple = (600, 200), font_path: str = None, color: str = "yellow") -> ImageSequenceClip:
+def create_counter_clip(target_number: int, duration: float = 1.5, size: tuple = (600, 200), font_path: str = None, color: str = "yellow") -> VideoClip:
     """
     Generate a counting-up animation clip.
     """
     fps = 30
-    frames = []
     
     try:
         font = ImageFont.truetype(font_path, 100) if font_path else ImageFont.load_default()
@@ -81,32 +77,55 @@ def create_counter_clip(target_number: int, duration: float = 1.5, size: tuple =
     else:
         fill_color = color
         
-    for i in range(int(duration * fps)):
-        progress = i / (duration * fps)
+    stroke_width = 4
+    stroke_fill = (0, 0, 0)
+    width, height = size
+
+    # Only the digit string changes between frames, so rasterize each glyph once
+    # (vertically centered like the "mm" anchor) and compose frames by slicing.
+    glyphs = {}
+    for ch in "0123456789,":
+        advance = int(round(font.getlength(ch)))
+        glyph = Image.new("RGBA", (advance + 2 * stroke_width, height), (0, 0, 0, 0))
+        ImageDraw.Draw(glyph).text((stroke_width, height // 2), ch, font=font, anchor="lm", fill=fill_color, stroke_width=stroke_width, stroke_fill=stroke_fill)
+        glyphs[ch] = (advance, np.array(glyph))
+
+    def compose(txt: str) -> np.ndarray:
+        frame = np.zeros((height, width, 4), dtype=np.uint8)
+        x = (width - sum(glyphs[ch][0] for ch in txt)) // 2
+        for ch in txt:
+            advance, glyph = glyphs[ch]
+            # The stroke spills past the advance, so keep whichever pixel is more opaque
+            left = x - stroke_width
+            x0, x1 = max(left, 0), min(left + glyph.shape[1], width)
+            if x0 < x1:
+                src = glyph[:, x0 - left:x1 - left]
+                dst = frame[:, x0:x1]
+                mask = src[..., 3] > dst[..., 3]
+                dst[mask] = src[mask]
+            x += advance
+        return frame
+
+    n_frames = int(duration * fps)
+    # txt -> (rgb, alpha); the ease-out holds the same value for several frames near the end
+    rendered = {}
+
+    def frame_at(t: float):
+        i = min(int(t * fps), n_frames - 1)
+        progress = i / n_frames
         # Ease out cubic
         eased = 1 - (1 - progress) ** 3
         current = int(target_number * eased)
         
-        target_int = int(target_number)
-        # If target was float?
-        
         txt = f"{current:,}"
-        
-        img = Image.new("RGBA", size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Draw text centered
-        # bbox = draw.textbbox((0,0), txt, font=font)
-        # w = bbox[2] - bbox[0]
-        # h = bbox[3] - bbox[1]
-        # pos = ((size[0] - w) // 2, (size[1] - h) // 2)
-        
-        # Stroke
-        stroke_width = 4
-        stroke_fill = (0, 0, 0)
-        
-        draw.text((size[0]//2, size[1]//2), txt, font=font, anchor="mm", fill=fill_color, stroke_width=stroke_width, stroke_fill=stroke_fill)
-        
-        frames.append(np.array(img))
-        
-    return ImageSequenceClip(frames, fps=fps)
+        if txt not in rendered:
+            frame = compose(txt)
+            rendered[txt] = (frame[..., :3], frame[..., 3] / 255.0)
+        return rendered[txt]
+
+    # Frames are composed lazily as the writer asks for them instead of being
+    # materialized up front; the alpha channel becomes the clip's mask.
+    clip_duration = n_frames / fps
+    mask = VideoClip(lambda t: frame_at(t)[1], is_mask=True, duration=clip_duration)
+    clip = VideoClip(lambda t: frame_at(t)[0], duration=clip_duration)
+    return clip.with_mask(mask).with_fps(fps)
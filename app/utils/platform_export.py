@@ -1,7 +1,9 @@
-
 import os
-from moviepy import VideoFileClip
+import shutil
+import subprocess
+import imageio_ffmpeg
 from loguru import logger
+from app.utils import utils
 
 PLATFORM_LIMITS = {
     "youtube_shorts":  {"max_duration": 60,  "aspect": "9:16", "suffix": "_shorts"},
@@ -9,6 +11,31 @@ PLATFORM_LIMITS = {
     "instagram_reels": {"max_duration": 90,  "aspect": "9:16", "suffix": "_reels"},
 }
 
+def _link_or_copy(video_path: str, out_path: str):
+    """
+    Hardlink video_path to out_path (free on the same filesystem), falling back to a copy.
+    """
+    if os.path.abspath(out_path) == os.path.abspath(video_path):
+        return
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    try:
+        os.link(video_path, out_path)
+    except OSError:
+        shutil.copy2(video_path, out_path)
+
+def _remux_all(video_path: str, outputs: list):
+    """
+    Stream-copy video_path into every (out_path, max_dur) in outputs with a single
+    ffmpeg run: the input is demuxed once and each output keeps only its first
+    max_dur seconds. Nothing is re-encoded.
+    """
+    cmd = [imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error", "-i", video_path]
+    for out_path, max_dur in outputs:
+        cmd += ["-t", f"{max_dur:.3f}"]
+        cmd += ["-map", "0", "-c", "copy", "-movflags", "+faststart", out_path]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
 def export_for_platforms(video_path: str, output_dir: str, platforms: list = None):
     """
     Export trimmed variants for each platform.
@@ -22,56 +49,34 @@ def export_for_platforms(video_path: str, output_dir: str, platforms: list = Non
     results = {}
     
     try:
-        # Load main video
-        # Note: We should use context manager or rigorous close() to avoid file locks
-        
-        # Optimization: If all requested platforms are > video duration, we can just copy?
-        # But we might need to enforce aspect ratio check or something.
-        # For now, let's assume input is already the correct aspect ratio (9:16) as per T0-5/T1-3
-        # If input is 16:9, and we want 9:16, we need to crop.
-        # But `params.video_aspect` controls the generation.
-        # If user generated 16:9 and asks for shorts, we might have a problem.
-        # Spec says: "auto-export trimmed variants". Implies mainly duration trim.
-        # Re-formatting aspect ratio is complex (AI crop).
-        # We will assume user generated 9:16 content if they want Shorts/Reels/TikTok.
-        # Or we just trim duration and ignore aspect ratio if it doesn't match?
-        # Spec AC-1 says "9:16".
-        
-        with VideoFileClip(video_path) as clip:
-            duration = clip.duration
-            
-            for platform in platforms:
-                spec = PLATFORM_LIMITS.get(platform)
-                if not spec:
-                    logger.warning(f"unknown platform: {platform}")
-                    continue
-                
-                # Check Duration
-                max_dur = spec["max_duration"]
-                
-                target_filename = os.path.basename(video_path).rsplit(".", 1)[0] + spec["suffix"] + ".mp4"
-                out_path = os.path.join(output_dir, target_filename)
-                
-                if duration <= max_dur:
-                    # Just copy or write?
-                    # Write to ensure encoding settings if needed?
-                    # Clip.write_videofile might re-encode.
-                    # Copy is faster if codec is compatible.
-                    # But verifying specific codec/bitrate might be needed.
-                    # Let's write_videofile for consistency and "trimmed" logic even if full length
-                    # (Clip.subclipped(0, duration) is same)
-                    
-                    # Actually, if duration is short enough, we just use full video.
-                    logger.info(f"exporting for {platform} (full duration: {duration:.2f}s) -> {out_path}")
-                    clip.write_videofile(out_path, codec="libx264", audio_codec="aac", logger=None)
-                else:
-                    # Trim
-                    # Spec AC-5: "Trim from start (keep beginning, cut end) to preserve hook"
-                    # Ideally we might want to speed up or pick best part, but "cut end" is simplest/safest for hook.
-                    logger.info(f"exporting for {platform} (trimmed to {max_dur}s) -> {out_path}")
-                    trimmed = clip.subclipped(0, max_dur)
-                    trimmed.write_videofile(out_path, codec="libx264", audio_codec="aac", logger=None)
-                    
+        # We assume the input is already 9:16 (params.video_aspect controls generation),
+        # so the variants only differ by duration limit. Platforms whose limit covers the
+        # whole video get the file itself (hardlinked); the rest are stream-copied and cut
+        # from the start (spec AC-5: keep the hook, cut the end).
+        duration = utils.get_video_duration(video_path)
+        base_name = os.path.basename(video_path).rsplit(".", 1)[0]
+
+        trims = {}
+        for platform in platforms:
+            spec = PLATFORM_LIMITS.get(platform)
+            if not spec:
+                logger.warning(f"unknown platform: {platform}")
+                continue
+
+            max_dur = spec["max_duration"]
+            out_path = os.path.join(output_dir, base_name + spec["suffix"] + ".mp4")
+
+            if duration <= max_dur:
+                logger.info(f"exporting for {platform} (full duration: {duration:.2f}s) -> {out_path}")
+                _link_or_copy(video_path, out_path)
+                results[platform] = out_path
+            else:
+                logger.info(f"exporting for {platform} (trimmed to {max_dur}s) -> {out_path}")
+                trims[platform] = (out_path, max_dur)
+
+        if trims:
+            _remux_all(video_path, list(trims.values()))
+            for platform, (out_path, _) in trims.items():
                 results[platform] = out_path
 
     except Exception as e:
@@ -1,8 +1,23 @@
 
+import bisect
+import re
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 from moviepy import VideoClip
 
+# List markers: "1.", "Step 1"
+_LIST_MARKER_RE = re.compile(r'(?:^|\s)(\d+)\.|^Step\s+(\d+)')
+# Start of an SRT time range: "00:00:01,500 --> ..."
+_SRT_START_RE = re.compile(r'\s*(\d+):(\d+):(\d+)[,.](\d+)')
+
+def _srt_start_seconds(time_str: str) -> float:
+    """Seconds at which an SRT "start --> end" range begins, 0.0 if unparsable."""
+    m = _SRT_START_RE.match(time_str)
+    if not m:
+        return 0.0
+    h, mi, s, ms = m.groups()
+    return int(h) * 3600 + int(mi) * 60 + int(s) + int(ms) / 1000.0
+
 def detect_list_content(script: str):
     """
     Detect if script is list-style. Returns list of segment boundaries.
@@ -30,24 +45,20 @@ def parse_list_from_subtitles(subtitles):
     subtitles: list of (index, time_str, text)
     Returns: [{"index": 1, "total": 3, "start": 0.0, "end": 5.0, "label": "1"}, ...]
     """
-    import re
-    from app.utils import utils
-    
     list_items = []
     # Patterns: "1.", "Step 1", "First", "(1)"
-    # Simplest: "^\d+\." or "Step \d+"
-    pattern = r'(?:^|\s)(\d+)\.|^Step\s+(\d+)'
+    # Simplest: "^\d+\." or "Step \d+" (_LIST_MARKER_RE)
     
     # We need to find Total.
     # Scan all subs first.
     param_matches = []
     for sub in subtitles:
         text = sub[2].strip()
-        match = re.search(pattern, text)
+        match = _LIST_MARKER_RE.search(text)
         if match:
              val = match.group(1) or match.group(2)
              if val.isdigit():
-                 start = utils.srt_time_to_seconds(sub[1].split(" --> ")[0])
+                 start = _srt_start_seconds(sub[1])
                  param_matches.append({"val": int(val), "start": start})
     
     if not param_matches:
@@ -137,18 +148,51 @@ def create_progress_bar_clip(video_size, subtitles, video_duration, bar_height=1
     else:
         fill_rgb = fill_color
         
+    # Positioning: Top of Safe Zone. 
+    # Safe zone top is usually ~100px down.
+    # Let's put it at y=100.
+    bar_y = 10
+    fill_rgba = tuple(fill_rgb) + (255,) * (4 - len(fill_rgb))
+
+    # Everything except the fill width is static: paint the background bar into a
+    # template once and composite frames with NumPy slicing instead of PIL drawing
+    template = np.zeros((bar_height + 40, w, 4), dtype=np.uint8)
+    template[bar_y:bar_y + bar_height + 1, 20:w - 19] = (255, 255, 255, 80)
+
+    # Counter labels only change between segments, so rasterize each "i/N" once
+    # (with the font loaded once) and blend the cached tile per frame
+    counter_tiles = {}
+    if show_counter:
+        try:
+            font = ImageFont.load_default()
+            for s in segments:
+                if s["index"] > 0 and s["index"] not in counter_tiles:
+                    txt = f"{s['index']}/{s['total']}"
+                    w_text = font.getlength(txt)
+                    tile = Image.new("RGBA", (int(w_text) + 1, bar_height + 40), (0, 0, 0, 0))
+                    ImageDraw.Draw(tile).text((0, 0), txt, font=font, fill="white")
+                    tile = np.array(tile)
+                    x = int((w - w_text) / 2)
+                    tile = tile[:, :max(0, min(tile.shape[1], w - x))]
+                    counter_tiles[s["index"]] = (x, tile.astype(np.float32), tile[..., 3:4] / 255.0)
+        except:
+            counter_tiles = {}
+
+    # make_frame runs per video frame, so flatten the segment dicts into parallel
+    # lists (starts / ends / counter tile) it can index by position.
+    # Each segment ends where the next one starts, so with sorted starts the current
+    # segment is found by bisection. Out-of-order markers keep the original scan.
+    starts = [s["start"] for s in segments]
+    ends = [s["end"] for s in segments]
+    tiles = [counter_tiles.get(s["index"]) for s in segments]
+    starts_sorted = starts == sorted(starts)
+
     def make_frame(t):
         # Find current segment
-        # Check explicit ranges
-        cur = None
-        for s in segments:
-            if s["start"] <= t:
-                if s["end"] is None or t < s["end"]:
-                    cur = s
-                    break
-        
-        if not cur:
-            cur = segments[-1] # Fallback
+        if starts_sorted:
+            idx = max(0, bisect.bisect_right(starts, t) - 1)
+        else:
+            idx = next((i for i in range(len(starts)) if starts[i] <= t < ends[i]), len(starts) - 1)
             
         # Global Progress within video? Or stepped?
         # Spec says: "Bar fills smoothly from segment to segment."
@@ -165,40 +209,20 @@ def create_progress_bar_clip(video_size, subtitles, video_duration, bar_height=1
         # Let's do: Fill = t / duration.
         # Text = "Step X/Y".
         
-        total = cur["total"]
-        if total == 0: total = 1
-        
         # Draw
-        img = Image.new("RGBA", (w, bar_height + 40), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Positioning: Top of Safe Zone. 
-        # Safe zone top is usually ~100px down.
-        # Let's put it at y=100.
-        bar_y = 10
-        
-        # Background bar
-        bg_color = (255, 255, 255, 80)
-        draw.rectangle([(20, bar_y), (w-20, bar_y+bar_height)], fill=bg_color, outline=None)
+        frame = template.copy()
         
         # Fill bar (Global progress)
         global_progress = t / video_duration
         fill_w = int((w-40) * global_progress)
-        draw.rectangle([(20, bar_y), (20+fill_w, bar_y+bar_height)], fill=fill_rgb)
+        frame[bar_y:bar_y + bar_height + 1, 20:21 + fill_w] = fill_rgba
         
         # Counter text
-        if show_counter and cur["index"] > 0:
-            txt = f"{cur['index']}/{cur['total']}"
-            try:
-                # Use default font
-                font = ImageFont.load_default()
-                # draw.text((w/2, 0), txt, font=font, fill="white", anchor="mt")
-                # anchor mt not supported in old PIL?
-                w_text = draw.textlength(txt, font=font)
-                draw.text(((w-w_text)/2, 0), txt, font=font, fill="white")
-            except:
-                pass
+        if tiles[idx] is not None:
+            x, tile, alpha = tiles[idx]
+            region = frame[:, x:x + tile.shape[1]]
+            region[:] = tile * alpha + region * (1.0 - alpha)
                 
-        return np.array(img)
+        return frame
 
     return VideoClip(make_frame, duration=video_duration)
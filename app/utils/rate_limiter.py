@@ -1,22 +1,36 @@
 """
 API Rate Limiter — Prevents hitting API limits for Pexels/Pixabay.
 """
+import threading
 import time
 from loguru import logger
 
+def _precise_sleep(seconds):
+    """Sleep until `seconds` have passed: OS sleep for the bulk, spin the last millisecond."""
+    deadline = time.monotonic() + seconds
+    if seconds > 1e-3:
+        time.sleep(seconds - 1e-3)
+    while time.monotonic() < deadline:
+        pass
+
 class RateLimiter:
     def __init__(self, calls_per_minute=30):
         self.delay = 60.0 / calls_per_minute
-        self.last_call = 0
+        # Monotonic timestamps, so wall-clock (NTP) adjustments can't skew the pacing
+        self.last_call = float("-inf")
+        self._lock = threading.Lock()
 
     def wait(self):
-        now = time.time()
-        elapsed = now - self.last_call
-        if elapsed < self.delay:
-            wait_time = self.delay - elapsed
+        # Reserve the next free slot under the lock, then sleep outside it: concurrent
+        # callers each get their own slot (one delay apart) instead of racing past
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.last_call + self.delay)
+            self.last_call = slot
+        wait_time = slot - now
+        if wait_time > 0:
             logger.debug(f"Rate limiter: waiting {wait_time:.2f}s")
-            time.sleep(wait_time)
-        self.last_call = time.time()
+            _precise_sleep(wait_time)
 
 # Global limiters
 # Pexels: 200 requests/hour recommended limit for free tier
@@ -1,6 +1,11 @@
 import numpy as np
 import re
 
+_SENT_SPLIT_RE = re.compile(r'[.!?]+')
+_DIGIT_RE = re.compile(r'\d')
+# Hedging words that lose the viewer (plain substring match, as before)
+_BORING_RE = re.compile(r'basically|sort of|maybe|usually', re.IGNORECASE)
+
 def predict_retention_curve(script_text, estimated_duration=60):
     """
     Generate per-second engagement prediction.
@@ -13,7 +18,7 @@ def predict_retention_curve(script_text, estimated_duration=60):
         return [0.5] * estimated_duration
 
     # Split into rough sentences to approximate timing
-    sentences = re.split(r'[.!?]+', script_text)
+    sentences = _SENT_SPLIT_RE.split(script_text)
     sentences = [s.strip() for s in sentences if s.strip()]
     
     if not sentences:
@@ -22,61 +27,46 @@ def predict_retention_curve(script_text, estimated_duration=60):
     # Estimate time per sentence (approx 150 words per minute = 2.5 words per second)
     words_per_sec = 2.5
     
-    curve = []
-    
     base_score = 0.5
+
+    n_words = np.array([len(sent.split()) for sent in sentences])
+    durations = np.maximum(1, (n_words / words_per_sec).astype(np.int64))
     
-    for sent in sentences:
-        words = sent.split()
-        n_words = len(words)
-        duration = max(1, int(n_words / words_per_sec))
-        
-        # Scoring logic
-        score = base_score
-        
-        # 1. Question boost
-        if "?" in sent:
-            score += 0.2
-            
-        # 2. Exclamation boost
-        if "!" in sent:
-            score += 0.1
-            
-        # 3. Short sentence boost
-        if n_words < 8:
-            score += 0.15
-        
-        # 4. Long sentence penalty
-        if n_words > 15:
-            score -= (n_words - 15) * 0.05
-            
-        # 5. Pattern interrupt (numbers)
-        if any(char.isdigit() for char in sent):
-            score += 0.1
-            
-        # 6. Negative word penalty (boring words)
-        if any(w in sent.lower() for w in ["basically", "sort of", "maybe", "usually"]):
-            score -= 0.1
+    # Scoring logic, one vector op per rule
+    scores = np.full(len(sentences), base_score)
+    
+    # 1. Question boost
+    scores += 0.2 * np.array(["?" in sent for sent in sentences])
+    
+    # 2. Exclamation boost
+    scores += 0.1 * np.array(["!" in sent for sent in sentences])
+    
+    # 3. Short sentence boost
+    scores += 0.15 * (n_words < 8)
+    
+    # 4. Long sentence penalty
+    scores -= np.maximum(n_words - 15, 0) * 0.05
+    
+    # 5. Pattern interrupt (numbers)
+    scores += 0.1 * np.array([_DIGIT_RE.search(sent) is not None for sent in sentences])
+    
+    # 6. Negative word penalty (boring words)
+    scores -= 0.1 * np.array([_BORING_RE.search(sent) is not None for sent in sentences])
 
-        # Clamp score
-        score = max(0.1, min(1.0, score))
-        
-        # Append to curve for the duration of this sentence
-        curve.extend([score] * duration)
+    # Clamp score, then hold each sentence's score for its duration
+    curve = np.repeat(np.clip(scores, 0.1, 1.0), durations)
 
     # Adjust total duration to match estimated_duration if needed
-    current_len = len(curve)
-    if current_len < estimated_duration:
-        curve.extend([curve[-1]] * (estimated_duration - current_len))
-    elif current_len > estimated_duration:
+    if len(curve) < estimated_duration:
+        curve = np.concatenate([curve, np.full(estimated_duration - len(curve), curve[-1])])
+    else:
         curve = curve[:estimated_duration]
         
     # Apply decay (viewers drop off naturally)
     # Linear decay: start 1.0 -> end 0.8 modifier
-    decay = np.linspace(1.0, 0.8, len(curve))
-    curve = [s * d for s, d in zip(curve, decay)]
+    curve = curve * np.linspace(1.0, 0.8, len(curve))
     
-    return curve
+    return curve.tolist()
 
 def get_retention_heatmap_data(script_text, duration=60):
     """
@@ -1,10 +1,12 @@
 import logging
-from typing import List, Dict, Tuple
+import re
+from functools import lru_cache
+from typing import Iterable, List, Dict, Pattern, Tuple
 
 logger = logging.getLogger(__name__)
 
 # Global negative terms (Safe for work/Kids friendly)
-GLOBAL_NEGATIVE_TERMS = [
+GLOBAL_NEGATIVE_TERMS = (
     # Sexual / Adult content
     "nude", "sex", "porn", "bikini", "underwear", "lingerie", "naked",
     "sexy", "seductive", "erotic", "adult", "mature", "strip", "escort",
@@ -25,7 +27,13 @@ GLOBAL_NEGATIVE_TERMS = [
     "gambling", "casino", "betting", "slot machine", "poker",
     # Profanity / Anger
     "angry", "rage", "scream", "hate", "curse", "swear",
-]
+)
+
+# Global terms that Horror/Mystery content is allowed to show
+_HORROR_ALLOWED_TERMS = frozenset({
+    "horror", "scary", "ghost", "zombie", "monster", "witch", "demon", "devil",
+    "satan", "hell", "death", "dead", "kill", "murder", "blood", "gore",
+})
 
 # Category specific negative terms
 CATEGORY_NEGATIVE_TERMS: Dict[str, List[str]] = {
@@ -63,13 +71,32 @@ SCRIPT_UNSAFE_WORDS = [
     "cocaine", "gun", "shoot", "rape", "suicide", "terrorist", "bomb",
     "torture", "abuse", "prostitut", "gambling", "drunk",
 ]
+_UNSAFE_WORDS_RE = re.compile("(?=(" + "|".join(map(re.escape, SCRIPT_UNSAFE_WORDS)) + "))")
+
+
+@lru_cache(maxsize=64)
+def _compile_terms(terms: Tuple[str, ...]) -> Pattern:
+    if not terms:
+        return re.compile(r"(?!)")  # matches nothing
+    return re.compile("|".join(re.escape(term.lower()) for term in terms))
+
+
+def compile_terms(terms: Iterable[str]) -> Pattern:
+    """
+    Compile terms into one case-folded alternation, so checking a text against all
+    of them is a single regex scan. pattern.search(text.lower()) is truthy iff
+    some term is a substring of the text. Compiled patterns are cached.
+    """
+    return _compile_terms(tuple(terms))
 
 
-def get_negative_terms(subject: str, category_hint: str = None) -> List[str]:
+@lru_cache(maxsize=256)
+def get_negative_terms(subject: str, category_hint: str = None) -> Tuple[str, ...]:
     """
     Determine negative terms based on subject and optional category hint.
+    The result is memoized, so it is returned as an immutable tuple.
     """
-    negative_terms = list(GLOBAL_NEGATIVE_TERMS)
+    negative_terms = GLOBAL_NEGATIVE_TERMS
     
     # Try to detect category from subject if not provided
     detected_category = category_hint
@@ -94,13 +121,11 @@ def get_negative_terms(subject: str, category_hint: str = None) -> List[str]:
 
     # If Horror category, remove horror-related bans from global list
     if detected_category and ("Horor" in detected_category or "Misteri" in detected_category):
-         for term in ["horror", "scary", "ghost", "zombie", "monster", "witch", "demon", "devil", "satan", "hell", "death", "dead", "kill", "murder", "blood", "gore"]:
-            if term in negative_terms:
-                negative_terms.remove(term)
+         negative_terms = tuple(term for term in negative_terms if term not in _HORROR_ALLOWED_TERMS)
 
     # Add category specific terms
     if detected_category and detected_category in CATEGORY_NEGATIVE_TERMS:
-        negative_terms.extend(CATEGORY_NEGATIVE_TERMS[detected_category])
+        negative_terms = negative_terms + tuple(CATEGORY_NEGATIVE_TERMS[detected_category])
     
     return negative_terms
 
@@ -113,11 +138,9 @@ def validate_script_safety(script: str) -> Tuple[bool, List[str]]:
     if not script:
         return True, []
 
-    script_lower = script.lower()
-    flagged = []
-    for word in SCRIPT_UNSAFE_WORDS:
-        if word in script_lower:
-            flagged.append(word)
+    # The lookahead reports a match at every position, so overlapping words are all found
+    found = set(_UNSAFE_WORDS_RE.findall(script.lower()))
+    flagged = [word for word in SCRIPT_UNSAFE_WORDS if word in found]
 
     return len(flagged) == 0, flagged
 
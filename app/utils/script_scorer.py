@@ -2,6 +2,10 @@
 import re
 from loguru import logger
 
+_WS_RE = re.compile(r'\s+')
+_SENT_SPLIT_RE = re.compile(r'[.!?]+')
+_WORD_RE = re.compile(r'\w+')
+
 # Default scoring weights
 DEFAULT_WEIGHTS = {
     "base_score": 50,
@@ -16,13 +20,13 @@ DEFAULT_WEIGHTS = {
 }
 
 # Keywords for analysis (English + Indonesian)
-EMOTIONAL_WORDS = {
+EMOTIONAL_WORDS = frozenset({
     "amazing", "incredible", "shocking", "unbelievable", "secret", "exposed", "mystery",
     "scary", "terrifying", "hilarious", "insane", "crazy", "best", "worst", "never",
     "fail", "win", "legendary", "myth", "truth",
     "luar biasa", "rahasia", "mengejutkan", "gila", "terbaik", "terburuk", "aneh",
     "misteri", "mengungkap", "dasyat", "keren", "parah", "wajib", "penting"
-}
+})
 
 CLIFFHANGER_PHRASES = [
     "but wait", "however", "here is the thing", "the truth is", "what happened next",
@@ -31,6 +35,9 @@ CLIFFHANGER_PHRASES = [
     "apa yang terjadi", "kamu tidak akan percaya", "tiba-tiba", "akhirnya"
 ]
 
+# All cliffhanger phrases in one alternation, so the text is scanned once
+_CLIFF_RE = re.compile("|".join(map(re.escape, CLIFFHANGER_PHRASES)))
+
 def score_script(script_text: str, weights: dict = None) -> dict:
     """
     Analyze script and return a score (0-100) with breakdown.
@@ -53,14 +60,17 @@ def score_script(script_text: str, weights: dict = None) -> dict:
     
     # Preprocessing
     # Remove extra whitespace
-    clean_text = re.sub(r'\s+', ' ', script_text).strip()
+    clean_text = _WS_RE.sub(' ', script_text).strip()
     
     # Split into sentences (naive split by punctuation)
-    sentences = re.split(r'[.!?]+', clean_text)
+    sentences = _SENT_SPLIT_RE.split(clean_text)
     sentences = [s.strip() for s in sentences if s.strip()]
     
+    # Lower-case once; word counting and phrase matching both work on it
+    lower_text = clean_text.lower()
+
     # Split into words
-    words = re.findall(r'\w+', clean_text.lower())
+    words = _WORD_RE.findall(lower_text)
     word_count = len(words)
     sentence_count = len(sentences)
     
@@ -103,7 +113,7 @@ def score_script(script_text: str, weights: dict = None) -> dict:
     breakdown["excitement_bonus"] = round(e_bonus, 1)
 
     # 4. Emotional Word Density
-    emo_count = sum(1 for word in words if word in EMOTIONAL_WORDS)
+    emo_count = sum(map(EMOTIONAL_WORDS.__contains__, words))
     emo_density = (emo_count / word_count) * 100
     emo_bonus = emo_density * w["emotional_word_bonus"]
     emo_bonus = min(emo_bonus, 20)
@@ -113,10 +123,7 @@ def score_script(script_text: str, weights: dict = None) -> dict:
         feedback.append("Script lacks emotional trigger words (e.g., amazing, secret, crazy).")
 
     # 5. Cliffhanger/Transition Phrases
-    cw_count = 0
-    lower_script = clean_text.lower()
-    for phrase in CLIFFHANGER_PHRASES:
-        cw_count += lower_script.count(phrase)
+    cw_count = len(_CLIFF_RE.findall(lower_text))
     
     cw_density = (cw_count / word_count) * 100
     cw_bonus = cw_density * w["cliffhanger_bonus"]
@@ -1,48 +1,242 @@
 
+import io
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageEnhance, ImageFilter, ImageDraw, ImageFont, ImageColor
-from moviepy import VideoFileClip
+import imageio_ffmpeg
 from loguru import logger
+from app.utils import utils
 import random
 import numpy as np
 
+# Optional libjpeg-turbo encoder (PyTurboJPEG + the system libturbojpeg); PIL otherwise
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
+@lru_cache(maxsize=16)
+def _shift_lut(shifts):
+    """Concatenated saturating uint8 lookup tables, one per band: i -> clamp(i + shift, 0, 255)."""
+    ramp = np.arange(256, dtype=np.int16)
+    return np.clip(ramp + np.array(shifts, dtype=np.int16)[:, None], 0, 255).ravel().tolist()
+
 def apply_color_shift(img, r=0, g=0, b=0):
     """Apply RGB color shift to image."""
-    data = np.array(img)
-    # R
-    data[..., 0] = np.clip(data[..., 0] + r, 0, 255)
-    # G
-    data[..., 1] = np.clip(data[..., 1] + g, 0, 255)
-    # B
-    data[..., 2] = np.clip(data[..., 2] + b, 0, 255)
-    return Image.fromarray(data)
+    # One saturating lookup table per band, applied by PIL in a single pass over
+    # the uint8 pixels (no widened temporaries); extra bands such as alpha are kept
+    return img.point(_shift_lut((r, g, b) + (0,) * (len(img.getbands()) - 3)))
+
+def _save_jpeg(img, path, quality=85):
+    """
+    Write img as JPEG, encoding RGB images straight from their buffer with libjpeg-turbo if available.
+
+    Baseline 4:2:0 at quality 85 with the default Huffman tables: no extra optimize pass,
+    and about 30% smaller than quality 90 with no visible difference at 1280x720
+    (YouTube caps thumbnails at 2MB).
+    """
+    if _turbo_jpeg is not None and img.mode == "RGB":
+        with open(path, "wb") as f:
+            f.write(_turbo_jpeg.encode(np.asarray(img), quality=quality, pixel_format=TJPF_RGB,
+                                       jpeg_subsample=TJSAMP_420))
+    else:
+        img.save(path, "JPEG", quality=quality, subsampling=2, optimize=False, progressive=False)
+
+# ITU-R 601 luma weights, as used by PIL's RGB -> L conversion
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+def apply_vibrant(img, contrast=1.2, color=1.5):
+    """
+    Equivalent (within rounding) to
+    ImageEnhance.Color(ImageEnhance.Contrast(img).enhance(contrast)).enhance(color),
+    computed in one float32 pass instead of two full intermediate PIL images.
+    PIL rounds the gray mean and the intermediate image to integers; this stays in
+    float throughout, so channels can differ by about one level.
+    """
+    # The float32 conversion is the only full-size copy; everything after works in place on it
+    data = np.asarray(img, dtype=np.float32)
+    rgb = data[..., :3]
+    # Contrast: scale around the mean gray level
+    mean = float((rgb @ _LUMA).mean())
+    rgb -= mean
+    rgb *= contrast
+    rgb += mean
+    np.clip(rgb, 0, 255, out=rgb)
+    # Color: scale away from each pixel's own gray level
+    gray = (rgb @ _LUMA)[..., None]
+    rgb -= gray
+    rgb *= color
+    rgb += gray
+    np.clip(rgb, 0, 255, out=rgb)
+    np.rint(data, out=data)
+    return Image.fromarray(data.astype(np.uint8))
+
+@lru_cache(maxsize=4)
+def _vignette_mask(w, h, intensity):
+    """Radial darkening factor per pixel: 1.0 at the center, 1 - intensity in the corners."""
+    yy, xx = np.ogrid[:h, :w]
+    r2 = ((xx - w / 2) / (w / 2)) ** 2 + ((yy - h / 2) / (h / 2)) ** 2
+    return (1.0 - intensity * r2 / r2.max()).astype(np.float32)[..., None]
 
 def add_vignette(img, intensity=0.4):
-    """Add vignette effect."""
+    """Add vignette effect (darken towards the corners)."""
     w, h = img.size
-    # Create gradient mask
-    # Simple radial gradient
-    # Center is white (transparent in mask context usually means opaqe if alpha mask? 
-    # Here we want to darken corners. So center=NoChange, Corners=Dark.
-    # We create a black layer and mask it.
-    
-    # Actually, simpler: create a radial gradient from transparent to black.
-    # PIL doesn't have built-in radial gradient easily.
-    # Approximate with halo used in video_effects or manual.
-    
-    # Quick vignette: Darken corners.
-    # Create a layer.
-    
-    # Method: Create a radial gradient image L mode.
-    # Center 255, corners 0. 
-    # Then use it to blend black layer?
-    
-    # Let's use a simpler approach for now to avoid complex deps:
-    # Just darken borders?
-    # Or skip if too complex for PIL only without numpy meshgrids.
-    pass 
-    # Revisit if needed. For now returning img as is or use simple contrast.
-    return img
+    data = np.asarray(img, dtype=np.float32)
+    data[..., :3] *= _vignette_mask(w, h, intensity)
+    return Image.fromarray(data.astype(np.uint8))
+
+@lru_cache(maxsize=8)
+def _load_font(font_size):
+    """Title font at font_size; parsed once per size and shared by every thumbnail."""
+    try:
+        # Try to use STHeitiMedium or fallback
+        font_path = os.path.join(utils.font_dir(), "STHeitiMedium.ttc")
+        if not os.path.exists(font_path):
+            font_path = "arial.ttf"
+        return ImageFont.truetype(font_path, font_size)
+    except Exception as e:
+        logger.warning(f"Failed to load custom font for thumbnail: {e}")
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=4096)
+def _text_length(font, text):
+    """Advance width of a word (no layout); fonts come from _load_font, so the key is stable."""
+    return font.getlength(text)
+
+@lru_cache(maxsize=256)
+def _text_bbox(font, text):
+    """Layout bbox of a single line, shared by every thumbnail using the same title and font."""
+    return font.getbbox(text)
+
+def _too_wide(line, font, max_width):
+    """Exact check of a laid-out line against max_width."""
+    bbox = _text_bbox(font, line)
+    return bbox[2] - bbox[0] > max_width
+
+def _wrap_text(text, font, max_width):
+    """
+    Greedily wrap text into lines no wider than max_width (a single over-long word
+    gets a line of its own).
+
+    The current line's width is kept as a running sum of word advances plus spaces, so
+    each word is measured once and no candidate strings are built; FreeType only lays
+    out the full line (getbbox) when the estimate comes close to the limit, where
+    kerning could decide the break.
+    """
+    space_w = _text_length(font, " ")
+    # Kerning and the bbox vs advance difference stay well within this margin
+    limit = max_width - max_width * 0.05
+
+    lines = []
+    current_line = []
+    current_w = 0.0
+    for word in text.split():
+        word_w = _text_length(font, word)
+        new_w = current_w + space_w + word_w if current_line else word_w
+        current_line.append(word)
+        if new_w > limit and _too_wide(" ".join(current_line), font, max_width):
+            # Exceeded, pop the last word and finalize the line
+            if len(current_line) > 1:
+                current_line.pop()
+                lines.append(" ".join(current_line))
+                current_line = [word]
+                current_w = word_w
+            else:
+                # Single word is too long, just add it anyway
+                lines.append(word)
+                current_line = []
+                current_w = 0.0
+        else:
+            current_w = new_w
+    if current_line:
+        lines.append(" ".join(current_line))
+    return lines
+
+@lru_cache(maxsize=8)
+def _text_layer(size, text_overlay):
+    """
+    Title overlay (shadow, stroke and text) rendered once onto a transparent RGBA
+    layer of the given size. Every variant of a video shares it and only pastes it,
+    so the text is laid out and rasterized once instead of per variant.
+
+    Returns (tile, offset): the layer cropped to the drawn pixels and its top-left
+    position, or None when nothing was drawn.
+    """
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    # Load font
+    font_size = int(layer.height * 0.08) # 8% of height for bold title
+    font = _load_font(font_size)
+
+    # Calculate text dimensions (Handle multiline if text is long)
+    # Wrap text if it exceeds 90% of image width
+    max_width = layer.width * 0.9
+    lines = _wrap_text(text_overlay, font, max_width)
+
+    # Draw multiline text centered horizontally, placed at the top (15% from top)
+    # Typical TikTok/Shorts cover style: Bold White text, Heavy Black Stroke/Shadow
+    try:
+        bbox = _text_bbox(font, lines[-1])
+        line_height = bbox[3] - bbox[1]
+    except Exception:
+        line_height = font_size
+
+    y = layer.height * 0.15 # Top 15%
+
+    for line in lines:
+        bbox = _text_bbox(font, line)
+        w = bbox[2] - bbox[0]
+
+        x = (layer.width - w) / 2
+
+        # Heavy Stroke/Shadow effect
+        shadow_color = "black"
+        text_color = "yellow" if "hook" in line.lower() or len(lines) == 1 else "white"
+        stroke_width = max(3, int(font_size * 0.05))
+
+        # Draw drop shadow (offset bottom right)
+        draw.text((x + stroke_width * 2, y + stroke_width * 2), line, font=font, fill=shadow_color)
+
+        # Draw main text with its thick stroke in one pass (FreeType strokes the
+        # outline once instead of re-rendering the line at every offset)
+        draw.text((x, y), line, font=font, fill=text_color,
+                  stroke_width=stroke_width, stroke_fill=shadow_color)
+
+        y += line_height * 1.2 # Move down for next line
+
+    # Blend only the region the title covers instead of the whole frame
+    box = layer.getbbox()
+    if box is None:
+        return None
+    return layer.crop(box), box[:2]
+
+def _grab_frame(video_path, ts, max_size=(1280, 720)):
+    """
+    Decode the single frame at ts, already shrunk to fit max_size. The input-side -ss
+    seeks to the preceding keyframe and decodes forward from there, instead of walking
+    the video from the start; ffmpeg's scaler then downsizes the frame before it is
+    piped out, so full-resolution pixels never reach Python.
+    """
+    max_w, max_h = max_size
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-loglevel", "error",
+        "-ss", f"{ts:.3f}", "-i", video_path,
+        "-frames:v", "1",
+        # Fit inside max_size keeping the aspect ratio, never upscale; area averaging
+        # (the same filter as PIL's BOX) avoids aliasing when downscaling
+        "-vf", f"scale='min({max_w},iw)':'min({max_h},ih)':force_original_aspect_ratio=decrease:flags=area",
+        "-f", "image2pipe", "-vcodec", "bmp", "-",
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0 or not result.stdout:
+        raise RuntimeError(f"ffmpeg could not read frame at {ts:.2f}s: {result.stderr.decode(errors='replace').strip()}")
+    img = Image.open(io.BytesIO(result.stdout))
+    img.load()
+    # ffmpeg already emits 24-bit RGB BMP; only convert (a full-frame copy) if it did not
+    return img if img.mode == "RGB" else img.convert("RGB")
 
 def generate_thumbnails(video_path: str, output_dir: str, count: int = 3, text_overlay: str = None):
     """
@@ -52,8 +246,7 @@ def generate_thumbnails(video_path: str, output_dir: str, count: int = 3, text_o
         os.makedirs(output_dir)
         
     try:
-        clip = VideoFileClip(video_path)
-        duration = clip.duration
+        duration = utils.get_video_duration(video_path)
         
         # Pick timestamps: 20%, 50%, 80%
         # If count > 3, add more.
@@ -73,18 +266,14 @@ def generate_thumbnails(video_path: str, output_dir: str, count: int = 3, text_o
         # Enhancements styles
         styles = [
             ("original", lambda img: img),
-            ("vibrant", lambda img: ImageEnhance.Color(ImageEnhance.Contrast(img).enhance(1.2)).enhance(1.5)),
+            ("vibrant", apply_vibrant),
             ("high_contrast", lambda img: ImageEnhance.Contrast(img).enhance(1.4)),
             ("warm", lambda img: apply_color_shift(img, r=20, g=10, b=-10)),
             ("cool", lambda img: apply_color_shift(img, r=-10, g=0, b=20)),
         ]
         
-        saved_paths = []
-        
-        for i, ts in enumerate(timestamps):
-            # Extract frame
-            frame = clip.get_frame(ts)
-            img = Image.fromarray(frame)
+        def render(i, ts):
+            img = _grab_frame(video_path, ts)
             
             # Apply Style (Cycle through styles)
             style_name, style_func = styles[i % len(styles)]
@@ -92,7 +281,7 @@ def generate_thumbnails(video_path: str, output_dir: str, count: int = 3, text_o
             # T5-2: AI Enhancement (Basics)
             # Always apply slight sharpening and upscale if needed?
             # Assuming 1080p source, thumbnail target 1280x720.
-            img.thumbnail((1280, 720)) # Resize to fit
+            # The frame is already resized to fit by ffmpeg in _grab_frame.
             # Actually we want to fill 1280x720?
             # If video is 9:16 (Shorts), thumbnail should ideally be 9:16 too for Shorts?
             # YouTube Shorts thumbnails are usually vertical.
@@ -103,96 +292,22 @@ def generate_thumbnails(video_path: str, output_dir: str, count: int = 3, text_o
             
             # Add text overlay if provided
             if text_overlay:
-                from PIL import ImageDraw, ImageFont
-                draw = ImageDraw.Draw(img)
-                # Load font
-                try:
-                    font_size = int(img.height * 0.08) # 8% of height for bold title
-                    # Try to use STHeitiMedium or fallback
-                    from app.utils.utils import font_dir
-                    import os
-                    font_path = os.path.join(font_dir(), "STHeitiMedium.ttc")
-                    if not os.path.exists(font_path):
-                        font_path = "arial.ttf"
-                    font = ImageFont.truetype(font_path, font_size)
-                except Exception as e:
-                    logger.warning(f"Failed to load custom font for thumbnail: {e}")
-                    font = ImageFont.load_default()
-                    
-                # Calculate text dimensions (Handle multiline if text is long)
-                # Wrap text if it exceeds 90% of image width
-                max_width = img.width * 0.9
-                words = text_overlay.split()
-                lines = []
-                current_line = []
-                
-                for word in words:
-                    current_line.append(word)
-                    # Check width
-                    test_line = " ".join(current_line)
-                    # PIL 10+ uses textbbox or textlength
-                    try:
-                        bbox = draw.textbbox((0, 0), test_line, font=font)
-                        w = bbox[2] - bbox[0]
-                    except AttributeError:
-                        w, _ = draw.textsize(test_line, font=font)
-                        
-                    if w > max_width:
-                        # Exceeded, pop the last word and finalize the line
-                        if len(current_line) > 1:
-                            current_line.pop()
-                            lines.append(" ".join(current_line))
-                            current_line = [word]
-                        else:
-                            # Single word is too long, just add it anyway
-                            lines.append(word)
-                            current_line = []
-                if current_line:
-                    lines.append(" ".join(current_line))
-                    
-                # Draw multiline text centered horizontally, placed at the top (15% from top)
-                # Typical TikTok/Shorts cover style: Bold White text, Heavy Black Stroke/Shadow
-                try:
-                    line_height = bbox[3] - bbox[1] if 'bbox' in locals() else draw.textsize("A", font=font)[1]
-                except:
-                    line_height = font_size
-                    
-                y = img.height * 0.15 # Top 15%
-                
-                for line in lines:
-                    try:
-                        bbox = draw.textbbox((0, 0), line, font=font)
-                        w = bbox[2] - bbox[0]
-                    except AttributeError:
-                        w, _ = draw.textsize(line, font=font)
-                        
-                    x = (img.width - w) / 2
-                    
-                    # Heavy Stroke/Shadow effect (Draw text multiple times slightly offset)
-                    shadow_color = "black"
-                    text_color = "yellow" if "hook" in line.lower() or len(lines) == 1 else "white"
-                    stroke_width = max(3, int(font_size * 0.05))
-                    
-                    # Draw thick stroke
-                    for offset_x in range(-stroke_width, stroke_width + 1):
-                        for offset_y in range(-stroke_width, stroke_width + 1):
-                            if offset_x == 0 and offset_y == 0: continue
-                            draw.text((x + offset_x, y + offset_y), line, font=font, fill=shadow_color)
-                            
-                    # Draw drop shadow (offset bottom right)
-                    draw.text((x + stroke_width * 2, y + stroke_width * 2), line, font=font, fill=shadow_color)
-                    
-                    # Draw main text
-                    draw.text((x, y), line, font=font, fill=text_color)
-                    
-                    y += line_height * 1.2 # Move down for next line
+                overlay = _text_layer(img.size, text_overlay)
+                if overlay is not None:
+                    tile, offset = overlay
+                    img.paste(tile, offset, tile)
 
             filename = f"thumbnail_{i+1}_{style_name}.jpg"
             path = os.path.join(output_dir, filename)
-            img.save(path, quality=90)
-            saved_paths.append(path)
+            _save_jpeg(img, path)
             logger.info(f"generated thumbnail: {path}")
-            
+            return path
+
+        # Each variant is independent; the ffmpeg seek and resize run out of process and
+        # the NumPy styles and JPEG encoding release the GIL, so threads render them in parallel
+        with ThreadPoolExecutor(max_workers=min(len(timestamps), os.cpu_count() or 1) or 1) as executor:
+            saved_paths = list(executor.map(render, range(len(timestamps)), timestamps))
+
         return saved_paths
         
     except Exception as e:
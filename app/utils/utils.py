@@ -1,6 +1,7 @@
 import json
 import locale
 import os
+from functools import lru_cache
 from pathlib import Path
 import threading
 from typing import Any
@@ -134,9 +135,11 @@ def run_in_background(func, *args, **kwargs):
 
 
 
+@lru_cache(maxsize=8192)
 def srt_time_to_seconds(time_str: str) -> float:
     """
     Convert SRT time string (00:00:01,500) to seconds (1.5).
+    Memoized: subtitle timestamps are parsed repeatedly across passes.
     """
     try:
         time_str = time_str.replace(",", ".")
@@ -282,6 +285,46 @@ def open_folder(path: str):
         logger.error(f"failed to open folder: {e}")
         return False
 
+# (path, mtime) -> duration in seconds
+_duration_cache = {}
+
+
+def get_video_duration(video_path: str) -> float:
+    """
+    Read the container duration with ffprobe (header only, nothing is decoded).
+    Results are cached per (path, mtime); falls back to MoviePy if ffprobe is
+    unavailable. Raises if the duration cannot be read at all.
+    """
+    import subprocess
+
+    key = (video_path, os.path.getmtime(video_path))
+    if key in _duration_cache:
+        return _duration_cache[key]
+
+    duration = None
+    status = check_ffmpeg_status()
+    if status["ffprobe"]:
+        cmd = [
+            status["ffprobe_path"], "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            video_path,
+        ]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            duration = float(result.stdout.strip())
+        except ValueError:
+            logger.warning(f"ffprobe could not read duration of {video_path}: {result.stderr.strip()}")
+    if duration is None:
+        from moviepy import VideoFileClip
+
+        with VideoFileClip(video_path) as clip:
+            duration = clip.duration
+
+    _duration_cache[key] = duration
+    return duration
+
+
 def check_ffmpeg_status() -> dict:
     """
     Check if ffmpeg and ffprobe are available.
@@ -5,9 +5,175 @@ Since we don't have vision AI available locally, this uses metadata-based heuris
 to score each downloaded video clip for relevance and quality.
 """
 
+import atexit
+import json
 import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+
 from loguru import logger
-from moviepy.video.io.VideoFileClip import VideoFileClip
+
+from app.utils import utils
+
+# Optional PyAV: reads container headers in-process, without spawning ffprobe per clip
+try:
+    import av
+except ImportError:
+    av = None
+
+
+def _displayed_size(width, height, rotation):
+    """Swap width/height for streams stored sideways with a 90/270 degree rotation."""
+    if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+        return height, width
+    return width, height
+
+
+def _probe_metadata_av(video_path: str):
+    """
+    (duration, width, height, fps) from PyAV; only headers are read, no packets decoded.
+    Returns None when the rotation can't be read, so the caller asks ffprobe instead.
+    """
+    with av.open(video_path, metadata_errors="ignore") as container:
+        stream = container.streams.video[0]
+        # Current FFmpeg reports rotation as display-matrix side data (the same value
+        # ffprobe lists in side_data_list); only older builds set the "rotate" tag
+        side_data = getattr(stream, "side_data", None)
+        rotation = stream.metadata.get("rotate")
+        if isinstance(side_data, dict):
+            rotation = side_data.get("DISPLAYMATRIX", rotation)
+        elif rotation is None:
+            return None
+        width, height = _displayed_size(
+            stream.codec_context.width, stream.codec_context.height, rotation
+        )
+        rate = stream.average_rate or stream.base_rate
+        fps = float(rate) if rate else 0.0
+        if container.duration is not None:
+            duration = container.duration / av.time_base
+        else:
+            duration = float(stream.duration * stream.time_base)
+    return duration, width, height, fps
+
+
+def _probe_metadata(video_path: str):
+    """
+    Read (duration, width, height, fps) from the container and stream headers with
+    PyAV if installed, else (or when PyAV can't read the clip) ffprobe; nothing is
+    decoded. Falls back to MoviePy when neither is available.
+    """
+    if av is not None:
+        try:
+            metadata = _probe_metadata_av(video_path)
+        except Exception as e:
+            logger.debug(f"PyAV probe failed for {video_path}, using ffprobe: {e}")
+            metadata = None
+        if metadata is not None:
+            return metadata
+
+    status = utils.check_ffmpeg_status()
+    if not status["ffprobe"]:
+        from moviepy.video.io.VideoFileClip import VideoFileClip
+
+        with VideoFileClip(video_path, audio=False) as clip:
+            return clip.duration, clip.w, clip.h, clip.fps
+
+    cmd = [
+        status["ffprobe_path"], "-v", "quiet", "-print_format", "json",
+        "-select_streams", "v:0", "-show_streams", "-show_format",
+        video_path,
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    info = json.loads(result.stdout)
+    if not info.get("streams"):
+        raise ValueError("no video stream found")
+    stream = info["streams"][0]
+
+    # Phone footage stores portrait video as landscape plus a rotation; report displayed size
+    rotation = stream.get("tags", {}).get("rotate")
+    for side_data in stream.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    width, height = _displayed_size(int(stream["width"]), int(stream["height"]), rotation)
+
+    # Rates are fractions such as "30000/1001"; "0/0" means unknown
+    rate = stream.get("avg_frame_rate", "0/0")
+    if rate.endswith("/0"):
+        rate = stream.get("r_frame_rate", "0/1")
+    fps = float(Fraction(rate)) if not rate.endswith("/0") else 0.0
+    duration = float(info["format"].get("duration") or stream["duration"])
+    return duration, width, height, fps
+
+
+# Probe results persisted across runs, keyed by (path, mtime, size): rescoring the same
+# downloaded clips (repeat runs, retries with another min_score) then reads no headers
+_PROBE_CACHE_PATH = os.path.join(utils.storage_dir(), "video_probe_cache.json")
+_PROBE_CACHE_MAX = 5000
+# Part of every key; bump when probing changes so stale entries are ignored
+# (2: PyAV probes read the display-matrix rotation)
+_PROBE_CACHE_VERSION = 2
+_probe_cache = None
+_probe_cache_dirty = False
+_probe_cache_lock = threading.Lock()
+
+
+def _load_probe_cache() -> dict:
+    global _probe_cache
+    if _probe_cache is None:
+        try:
+            with open(_PROBE_CACHE_PATH, "r", encoding="utf-8") as f:
+                _probe_cache = json.load(f)
+        except (OSError, ValueError):
+            _probe_cache = {}
+    return _probe_cache
+
+
+def _save_probe_cache():
+    """Write the probe cache back to disk if it changed (atomically, newest entries kept)."""
+    global _probe_cache_dirty
+    with _probe_cache_lock:
+        if not _probe_cache_dirty:
+            return
+        entries = list(_probe_cache.items())[-_PROBE_CACHE_MAX:]
+        tmp_path = _PROBE_CACHE_PATH + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(_PROBE_CACHE_PATH), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(entries), f)
+            os.replace(tmp_path, _PROBE_CACHE_PATH)
+            _probe_cache_dirty = False
+        except OSError as e:
+            logger.warning(f"failed to save video probe cache: {e}")
+
+
+atexit.register(_save_probe_cache)
+
+
+def _cached_probe_metadata(video_path: str, stat: os.stat_result):
+    """_probe_metadata, memoized on disk per (absolute path, mtime, size)."""
+    global _probe_cache_dirty
+    key = f"{_PROBE_CACHE_VERSION}|{os.path.abspath(video_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    with _probe_cache_lock:
+        cached = _load_probe_cache().get(key)
+    if cached is not None:
+        return tuple(cached)
+
+    metadata = _probe_metadata(video_path)
+    with _probe_cache_lock:
+        _load_probe_cache()[key] = list(metadata)
+        _probe_cache_dirty = True
+    return metadata
+
+
+# Upper bound of the metadata-based points: duration 25 + resolution 25 + fps 15
+# + aspect 10 + bitrate 15 + stability 10
+_MAX_METADATA_SCORE = 100
+
+
+def _tokenize(search_term: str) -> tuple:
+    """Lower-cased search keywords used for the tag match bonus (words of 3+ characters)."""
+    return tuple(t.strip().lower() for t in search_term.split() if len(t) > 2)
 
 
 def score_video(
@@ -16,10 +182,16 @@ def score_video(
     minimum_duration: float = 3.0,
     minimum_resolution: int = 720,
     minimum_fps: int = 24,
+    tokens: tuple = None,
+    min_score: int = None,
 ) -> dict:
     """
     Score a video clip based on quality heuristics.
     
+    tokens: pre-computed _tokenize(search_term), so batch callers tokenize once.
+    min_score: when given, clips that provably cannot reach it are rejected before
+    their metadata is read.
+    
     Returns:
         dict with 'score' (0-100), 'passed' (bool), and 'details' (dict)
     """
@@ -30,7 +202,8 @@ def score_video(
         if not os.path.exists(video_path):
             return {"score": 0, "passed": False, "details": {"error": "File not found"}}
         
-        file_size = os.path.getsize(video_path)
+        stat = os.stat(video_path)
+        file_size = stat.st_size
         
         # File size check (very small files are likely corrupt)
         if file_size < 50_000:  # < 50KB
@@ -38,10 +211,30 @@ def score_video(
         
         details["file_size_mb"] = round(file_size / (1024 * 1024), 2)
         
-        clip = VideoFileClip(video_path)
+        # [I3] Tag match score (0-30 points)
+        # Give a massive bonus to videos where the exact search term keywords appear in the path/name.
+        # This ensures a highly relevant 720p video easily beats a generic irrelevant 1080p video.
+        if tokens is None:
+            tokens = _tokenize(search_term) if search_term else ()
+        if search_term or tokens:
+            path_lower = video_path.lower()
+            matched = sum(map(path_lower.__contains__, tokens))
+            # +10 points per matched keyword, up to 30 points
+            tag_score = min(30, matched * 10)
+            score += tag_score
+            details["tag_match_score"] = tag_score
+        else:
+            details["tag_match_score"] = 0
+
+        # Cheap predicates first: if even full metadata points cannot lift this clip
+        # to min_score, reject it without probing the file
+        if min_score is not None and score + _MAX_METADATA_SCORE < min_score:
+            details["total_score"] = score
+            return {"score": score, "passed": False, "details": details}
+        
+        duration, width, height, fps = _cached_probe_metadata(video_path, stat)
         
         # Duration scoring (0-25 points)
-        duration = clip.duration
         details["duration"] = round(duration, 1)
         if duration >= minimum_duration:
             duration_score = min(25, int(duration * 5))
@@ -51,8 +244,6 @@ def score_video(
             details["duration_score"] = 0
         
         # Resolution scoring (0-25 points)
-        width = clip.w
-        height = clip.h
         details["resolution"] = f"{width}x{height}"
         min_dim = min(width, height)
         if min_dim >= 1080:
@@ -68,7 +259,6 @@ def score_video(
             details["resolution_score"] = 0
         
         # FPS scoring (0-15 points)
-        fps = clip.fps
         details["fps"] = round(fps, 1)
         if fps >= 30:
             score += 15
@@ -114,22 +304,6 @@ def score_video(
         score += 10
         details["stability_score"] = 10
 
-        # [I3] Tag match score (0-30 points)
-        # Give a massive bonus to videos where the exact search term keywords appear in the path/name.
-        # This ensures a highly relevant 720p video easily beats a generic irrelevant 1080p video.
-        if search_term:
-            tokens = [t.strip().lower() for t in search_term.split() if len(t) > 2]
-            path_lower = video_path.lower()
-            matched = sum(1 for t in tokens if t in path_lower)
-            # +10 points per matched keyword, up to 30 points
-            tag_score = min(30, matched * 10)
-            score += tag_score
-            details["tag_match_score"] = tag_score
-        else:
-            details["tag_match_score"] = 0
-
-        clip.close()
-        
         passed = score >= 40  # Minimum threshold
         details["total_score"] = score
         
@@ -158,14 +332,21 @@ def filter_videos_by_quality(
     """
     scored_videos = []
     
-    for path in video_paths:
-        result = score_video(path, search_term=search_term)
+    tokens = _tokenize(search_term)
+
+    # Scoring is mostly waiting on ffprobe subprocesses, so score the clips concurrently
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(video_paths)))) as executor:
+        results = list(executor.map(lambda p: score_video(p, search_term=search_term, tokens=tokens, min_score=min_score), video_paths))
+
+    for path, result in zip(video_paths, results):
         if result["passed"] and result["score"] >= min_score:
             scored_videos.append((path, result["score"]))
             logger.debug(f"Video PASSED ({result['score']}/100): {os.path.basename(path)}")
         else:
             logger.debug(f"Video REJECTED ({result['score']}/100): {os.path.basename(path)} — {result['details']}")
     
+    _save_probe_cache()
+
     # Sort by score descending (best first)
     scored_videos.sort(key=lambda x: x[1], reverse=True)
     
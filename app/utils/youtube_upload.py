@@ -32,6 +32,7 @@ except ImportError:
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 CLIENT_SECRET_FILE = "client_secret.json"
 TOKEN_FILE = "youtube_token.json"
+UPLOAD_CHUNK_SIZE = 50 * 1024 * 1024
 
 # YouTube category IDs
 CATEGORY_MAP = {
@@ -67,7 +68,8 @@ def get_authenticated_service(client_secret_path: str = "", token_path: str = ""
     if os.path.exists(token_path):
         creds = Credentials.from_authorized_user_file(token_path, SCOPES)
     
-    # Refresh or get new token
+    # Refresh or get new token. creds.valid only compares the stored expiry with the
+    # clock, so a still-valid token costs no network round trip here
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
@@ -84,7 +86,25 @@ def get_authenticated_service(client_secret_path: str = "", token_path: str = ""
             token_file.write(creds.to_json())
         logger.info(f"Token saved to: {token_path}")
     
-    return build("youtube", "v3", credentials=creds)
+    # Use the discovery document bundled with google-api-python-client instead of
+    # fetching it over HTTP (and skip the discovery file cache, unused then)
+    return build("youtube", "v3", credentials=creds, cache_discovery=False, static_discovery=True)
+
+
+def _load_metadata(metadata_json_path: str) -> dict:
+    """Read a metadata.json (title/description/tags); empty dict if missing or unreadable."""
+    if not metadata_json_path or not os.path.exists(metadata_json_path):
+        return {}
+    try:
+        with open(metadata_json_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if not isinstance(metadata, dict):
+            raise ValueError("metadata.json must contain an object")
+        logger.info(f"Loaded metadata from: {metadata_json_path}")
+        return metadata
+    except Exception as e:
+        logger.warning(f"Failed to load metadata: {str(e)}")
+        return {}
 
 
 def upload_video(
@@ -95,6 +115,7 @@ def upload_video(
     category: str = "General",
     privacy: str = "private",
     metadata_json_path: str = "",
+    youtube=None,
 ) -> dict:
     """
     Upload a video to YouTube.
@@ -107,6 +128,7 @@ def upload_video(
         category: Category name (mapped to YouTube category ID)
         privacy: "private", "unlisted", or "public"
         metadata_json_path: Path to metadata.json (overrides title/desc/tags)
+        youtube: Authenticated service to reuse (authenticates if not given)
     
     Returns:
         dict with upload result info
@@ -116,16 +138,11 @@ def upload_video(
         return {"status": "error", "message": "File not found"}
     
     # Load metadata from JSON if available
-    if metadata_json_path and os.path.exists(metadata_json_path):
-        try:
-            with open(metadata_json_path, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-            title = title or metadata.get("title", "")
-            description = description or metadata.get("description", "")
-            tags = tags or metadata.get("tags", [])
-            logger.info(f"Loaded metadata from: {metadata_json_path}")
-        except Exception as e:
-            logger.warning(f"Failed to load metadata: {str(e)}")
+    metadata = _load_metadata(metadata_json_path)
+    if metadata:
+        title = title or metadata.get("title", "")
+        description = description or metadata.get("description", "")
+        tags = tags or metadata.get("tags", [])
     
     # Defaults
     if not title:
@@ -136,7 +153,8 @@ def upload_video(
         tags = []
     
     # Get YouTube service
-    youtube = get_authenticated_service()
+    if youtube is None:
+        youtube = get_authenticated_service()
     if not youtube:
         return {"status": "error", "message": "Authentication failed"}
     
@@ -165,7 +183,9 @@ def upload_video(
             video_path,
             mimetype="video/mp4",
             resumable=True,
-            chunksize=10 * 1024 * 1024,  # 10MB chunks
+            # 50MB chunks (must be a multiple of 256KB): each chunk is a separate HTTPS
+            # request, so fewer, larger chunks cut per-request round trips on long uploads
+            chunksize=UPLOAD_CHUNK_SIZE,
         )
         
         request = youtube.videos().insert(
@@ -217,8 +237,13 @@ def batch_upload(
         logger.error(f"Directory not found: {video_dir}")
         return
     
-    import glob
-    video_files = sorted(glob.glob(os.path.join(video_dir, "*.mp4")))
+    # DirEntry.is_file() uses the type from the directory listing, no extra stat per entry;
+    # hidden files (e.g. macOS "._*.mp4" resource forks) are skipped like glob did
+    with os.scandir(video_dir) as entries:
+        video_files = sorted(
+            e.path for e in entries
+            if e.name.endswith(".mp4") and not e.name.startswith(".") and e.is_file()
+        )
     
     if not video_files:
         logger.warning(f"No .mp4 files found in: {video_dir}")
@@ -226,19 +251,27 @@ def batch_upload(
     
     logger.info(f"Found {len(video_files)} videos to upload from: {video_dir}")
     
+    # Authenticate once; every upload reuses the same service and its HTTP connection
+    youtube = get_authenticated_service()
+    if not youtube:
+        logger.error("Authentication failed")
+        return [{"status": "error", "message": "Authentication failed"} for _ in video_files]
+    
+    # Every video shares the directory's metadata.json, so read it once
+    metadata = _load_metadata(os.path.join(video_dir, "metadata.json"))
+
     results = []
     for i, video_file in enumerate(video_files, 1):
         logger.info(f"\n--- Uploading {i}/{len(video_files)} ---")
         
-        # Check for metadata.json alongside the video
-        base_name = os.path.splitext(video_file)[0]
-        metadata_path = os.path.join(os.path.dirname(video_file), "metadata.json")
-        
         result = upload_video(
             video_path=video_file,
+            title=metadata.get("title", ""),
+            description=metadata.get("description", ""),
+            tags=metadata.get("tags", []),
             category=category,
             privacy=privacy,
-            metadata_json_path=metadata_path,
+            youtube=youtube,
         )
         results.append(result)
         
@@ -4,11 +4,14 @@ Reads topics from a JSON file, generates videos, organizes by category, and prod
 """
 
 import argparse
+import json
+import multiprocessing
 import os
 import re
 import sys
 import uuid
 import time as time_module
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
 from loguru import logger
@@ -21,13 +24,98 @@ from app.utils import bgm_matcher
 from app.utils import cleanup
 from app.utils import db
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # VOICES
 VOICE_NAME = "en-US-ChristopherNeural"
 
 root_dir = os.path.dirname(os.path.abspath(__file__))
 
+# Topic names look like Category_01_Title_With_Underscores
+_TOPIC_RE = re.compile(r'^([^_]+)_\d+_(.+)$')
+# Manifests at least this big are stream-parsed instead of read whole with json.load
+_STREAM_THRESHOLD = 10 * 1024 * 1024
+
+
+def _load_topics(json_file):
+    """
+    Read the topics array from json_file.
+    Large manifests are parsed item by item with ijson (when installed), so the raw
+    file text never sits in memory next to the decoded list.
+    """
+    with open(json_file, 'rb') as f:
+        if ijson is not None and os.fstat(f.fileno()).st_size >= _STREAM_THRESHOLD:
+            return list(ijson.items(f, 'item'))
+        return json.load(f)
+
+
+def _parse_topic(topic):
+    """
+    Clean subject for AI generation.
+    Input format: Category_01_Title_With_Underscores
+    Output format: Category - Title With Spaces
+    Returns (category, clean_subject, title_clean).
+    """
+    category = "General"  # Default category
+
+    # Match pattern: Category_Number_Title
+    match = _TOPIC_RE.match(topic)
+    if match:
+        category, title_part = match.groups()
+        title_clean = title_part.replace('_', ' ')
+        clean_subject = f"{category} - {title_clean}"
+    else:
+        parts = topic.split('_')
+        if len(parts) > 1:
+            # Assume first part is category
+            category = parts[0]
+        clean_subject = topic.replace('_', ' ')
+        title_clean = clean_subject
+    return category, clean_subject, title_clean
+
+
+def _init_worker(gpu_list, counter):
+    """Pin each worker process to one GPU, round-robin over gpu_list."""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    # Set before this process first touches CUDA (faster-whisper, NVENC), which is lazy
+    os.environ["CUDA_VISIBLE_DEVICES"] = gpu_list[index % len(gpu_list)]
+    logger.info(f"Batch worker {index + 1} pinned to GPU {gpu_list[index % len(gpu_list)]}")
+
+
+def _drain_jobs(worker_id):
+    """Worker-process entry point: run queued jobs until the queue is empty."""
+    from app.services.task_worker import TaskWorker
+    return TaskWorker().drain(worker_id)
+
+
+def _process_queued_jobs(workers, gpus=None):
+    """
+    Run the pending jobs in `workers` processes. Topics are independent, so each
+    process claims jobs from the DB queue (claims are atomic) until none are left.
+    gpus: optional list of GPU ids; workers are spread over them round-robin.
+    """
+    # spawn: every worker starts a fresh interpreter and opens its own SQLite connections
+    ctx = multiprocessing.get_context("spawn")
+    pool_kwargs = {}
+    if gpus:
+        pool_kwargs = {"initializer": _init_worker, "initargs": (list(gpus), ctx.Value("i", 0))}
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, **pool_kwargs) as pool:
+        futures = [pool.submit(_drain_jobs, i + 1) for i in range(workers)]
+        for fut in as_completed(futures):
+            try:
+                processed += fut.result()
+            except Exception as e:
+                logger.error(f"Batch worker crashed: {e}")
+    return processed
+
 
-def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False, resume_mode=False, use_veo=False, veo_prompt_template="", veo_negative_prompt="", veo_resolution="1080p", veo_auto_prompt=False, use_faceless=False):
+def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False, resume_mode=False, use_veo=False, veo_prompt_template="", veo_negative_prompt="", veo_resolution="1080p", veo_auto_prompt=False, use_faceless=False, workers=0, gpus=None):
     logger.remove()
     logger.add(sys.stderr, level="DEBUG")
 
@@ -35,10 +123,8 @@ def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False
     db.init_db()
     
     # Read topics from file
-    import json
     try:
-        with open(json_file, 'r') as f:
-            topics = json.load(f)
+        topics = _load_topics(json_file)
     except FileNotFoundError:
         logger.error(f"File not found: {json_file}")
         return
@@ -54,6 +140,13 @@ def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False
     # Progress tracking
     batch_start_time = time_module.time()
     results = []  # list of dicts: {topic, status, duration, file_size, attempts}
+    queued_jobs = []  # rows for db.insert_jobs_bulk, written once after the loop
+    stale_job_ids = []  # resume mode: old failed/stuck jobs, deleted once after the loop
+    created_dirs = set()  # categories whose batch_outputs directory exists
+
+    # Parse every topic up front and fetch their existing jobs in a few IN (...) queries
+    parsed_topics = [_parse_topic(topic) for topic in topics]
+    existing_jobs = db.get_jobs_by_topics([subject for _, subject, _ in parsed_topics])
 
     for i, topic in enumerate(topics):
         logger.info(f"Processing topic {i+1}/{len(topics)}: {topic}")
@@ -61,35 +154,15 @@ def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False
         task_id = str(uuid.uuid4())
         topic_start = time_module.time()
 
-        # Clean subject for AI generation
-        # Input format: Category_01_Title_With_Underscores
-        # Output format: Category - Title With Spaces
-        
-        clean_subject = topic
-        category = "General"  # Default category
+        category, clean_subject, title_clean = parsed_topics[i]
         search_terms = []
-        
-        # Match pattern: Category_Number_Title
-        match = re.match(r'^([^_]+)_\d+_(.+)$', topic)
-        if match:
-            category, title_part = match.groups()
-            title_clean = title_part.replace('_', ' ')
-            clean_subject = f"{category} - {title_clean}"
-        else:
-            parts = topic.split('_')
-            if len(parts) > 1:
-                # Assume first part is category
-                category = parts[0]
-                clean_subject = topic.replace('_', ' ')
-            else:
-                clean_subject = topic
 
         # Override category if provided via CLI
         if category_arg:
             category = category_arg
 
         # DB: Check existing job status
-        existing_job = db.get_job_by_topic(clean_subject)
+        existing_job = existing_jobs.get(clean_subject)
         
         if resume_mode:
             # Resume mode: only process failed/stuck jobs
@@ -105,8 +178,9 @@ def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False
                     continue
             if existing_job['status'] in ('failed', 'processing'):
                 logger.info(f"Resume mode: Retrying {existing_job['status']} job: {clean_subject}")
-                # Delete old job record, will create fresh one below
-                db.delete_job(existing_job['id'])
+                # Delete old job record (in bulk after the loop), a fresh one is queued below
+                stale_job_ids.append(existing_job['id'])
+                existing_jobs.pop(clean_subject, None)
             else:
                 logger.info(f"Resume mode: Skipping status={existing_job['status']}: {clean_subject}")
                 results.append({"topic": topic, "status": "skipped", "duration": 0, "file_size": 0, "attempts": 0})
@@ -120,23 +194,6 @@ def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False
                     results.append({"topic": topic, "status": "skipped", "duration": 0, "file_size": 0, "attempts": 0})
                     continue
 
-        db.insert_job(task_id, clean_subject, category, status="processing")
-
-        search_terms = []
-        
-        # Match pattern: Category_Number_Title
-        match = re.match(r'^([^_]+)_\d+_(.+)$', topic)
-        if match:
-            category, title_part = match.groups()
-            title_clean = title_part.replace('_', ' ')
-            clean_subject = f"{category} - {title_clean}"
-        else:
-            parts = topic.split('_')
-            if len(parts) > 1:
-                category = parts[0]
-            clean_subject = topic.replace('_', ' ')
-            title_clean = clean_subject
-            
         logger.info(f"  > Subject for AI: {clean_subject}")
         
         # Extract search terms from title
@@ -154,17 +211,13 @@ def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False
             logger.info(f"  > Forced Search Terms: {search_terms}")
             
         # Define negative terms using centralized safety logic
-        negative_terms = safety_filters.get_negative_terms(clean_subject, category_hint=category)
+        negative_terms = list(safety_filters.get_negative_terms(clean_subject, category_hint=category))
         logger.info(f"  > Negative Terms (from safety_filters): {negative_terms}")
 
-        # Check if output file already exists to skip re-generation
-        safe_name = re.sub(r'[\\/*?:"<>|]', "", topic)
-        
-        # Create category-specific directory
-        batch_dir = os.path.join(root_dir, "batch_outputs", category)
-        os.makedirs(batch_dir, exist_ok=True)
-        
-        final_output_path = os.path.join(batch_dir, f"{safe_name}.mp4")
+        # Create category-specific directory (once per category, not a mkdir per topic)
+        if category not in created_dirs:
+            os.makedirs(os.path.join(root_dir, "batch_outputs", category), exist_ok=True)
+            created_dirs.add(category)
         
         # Get category-matched BGM
         matched_bgm = bgm_matcher.get_bgm_for_category(category)
@@ -195,19 +248,42 @@ def run_batch(json_file, category_arg=None, delay_seconds=0, force_rebuild=False
             use_faceless=use_faceless
         )
 
-        # Insert job to DB
+        # Queue job for the bulk DB insert below
         meta_data = params.dict()
-        db.add_job(task_id, clean_subject, category, status="pending", meta=meta_data)
+        queued_jobs.append((task_id, clean_subject, category, "pending", meta_data, None))
         logger.success(f"Queued job: {clean_subject}")
 
         results.append({
             "topic": topic, 
+            "subject": clean_subject,
             "status": "queued", 
             "duration": 0, 
             "file_size": 0,
             "attempts": 0
         })
 
+    # Both in one go each: an executemany and a single commit instead of one per topic
+    db.delete_jobs(stale_job_ids)
+    db.insert_jobs_bulk(queued_jobs)
+
+    # Optionally run the queued jobs right here instead of leaving them to the TaskWorker
+    if workers and workers > 0 and queued_jobs:
+        logger.info(f"Processing queued jobs with {workers} worker processes...")
+        processed = _process_queued_jobs(workers, gpus)
+        logger.info(f"Processed {processed} jobs")
+        queued_results = [r for r in results if r["status"] == "queued"]
+        final_jobs = db.get_jobs_by_topics([r["subject"] for r in queued_results])
+        for r in queued_results:
+            job = final_jobs.get(r["subject"])
+            if not job or job["status"] not in ("success", "failed"):
+                continue
+            output_path = job.get("output_path")
+            r["status"] = job["status"]
+            r["duration"] = job.get("duration_seconds") or 0
+            r["attempts"] = job.get("attempts") or 0
+            if output_path and os.path.exists(output_path):
+                r["file_size"] = os.path.getsize(output_path)
+
     # Generate batch report
     batch_duration = time_module.time() - batch_start_time
     _generate_report(results, batch_duration, category, root_dir)
@@ -263,6 +339,10 @@ if __name__ == "__main__":
     parser.add_argument('--veo-resolution', help='Veo resolution', default="1080p")
     parser.add_argument('--veo-auto-prompt', action='store_true', help='Auto-generate Veo prompts using LLM')
     parser.add_argument("--faceless", action="store_true", help="Enable Faceless Content Mode") # New arg
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Process the queued jobs with N parallel worker processes (0 = only queue them)')
+    parser.add_argument('--gpus', default="",
+                        help='Comma-separated GPU ids to spread --workers over, e.g. 0,1,2,3')
     args = parser.parse_args()
     
     if args.delay > 0:
@@ -281,5 +361,7 @@ if __name__ == "__main__":
         veo_negative_prompt=args.veo_negative,
         veo_resolution=args.veo_resolution,
         veo_auto_prompt=args.veo_auto_prompt,
-        use_faceless=args.faceless
+        use_faceless=args.faceless,
+        workers=args.workers,
+        gpus=[g.strip() for g in args.gpus.split(",") if g.strip()]
     )